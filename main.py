@@ -1,89 +1,71 @@
 import os
-import requests
-import time
-import random
-import json
+import argparse
 from datetime import datetime
-
-print("Firecrawl key loaded:", os.getenv("FIRECRAWL_KEY") is not None)
-print("X token loaded:", os.getenv("X_BEARER_TOKEN") is not None)
+from tweetbot import httpclient, metrics, profiling
+from tweetbot.firecrawl import FIRECRAWL_API_URL
+from tweetbot.pages import read_response
+from tweetbot.history import load_history
+from tweetbot.scheduler import PostQueue, run_due
+from tweetbot.tweets import make_tweet
+from tweetbot.xclient import XClient
 
 # Load API keys from environment variables
 firecrawl_api_key = os.getenv("FIRECRAWL_KEY")
 bearer_token = os.getenv("X_BEARER_TOKEN")
 
-# File to store tweet history
-HISTORY_FILE = "tweet_history.json"
-
 # Chance to skip posting for the day (simulating human off days)
 OFF_DAY_CHANCE = 0.15  # 15% of days no tweets
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r") as f:
-            return json.load(f)
-    return []
-
-def save_history(history):
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f)
-
 def get_links(query):
-    url = "https://api.firecrawl.com/v1/scrape"
+    url = f"{FIRECRAWL_API_URL}/v1/scrape"
     payload = {"query": query, "maxResults": 5}
     headers = {"Authorization": f"Bearer {firecrawl_api_key}"}
-    r = requests.post(url, json=payload, headers=headers)
-    results = r.json().get("data", [])
-    return [{"title": r["title"], "url": r["url"]} for r in results]
-
-def post_tweet(text):
-    url = "https://api.x.com/2/tweets"
-    headers = {"Authorization": f"Bearer {bearer_token}", "Content-Type": "application/json"}
-    payload = {"text": text}
-    r = requests.post(url, json=payload, headers=headers)
-    print(f"[{datetime.now()}] {r.status_code} - {text}")
-    return r.status_code == 201
-
-def make_tweet(title, url):
-    prefixes = ["🚀", "📢", "🔥", "💡", "🎯", "🧠"]
-    templates = [
-        "{prefix} {title} {url}",
-        "{prefix} Check this out: {title} {url}",
-        "{prefix} New resource: {title} {url}",
-        "{prefix} Just found: {title} {url}",
-        "{prefix} Insight drop: {title} {url}"
-    ]
-    template = random.choice(templates)
-    return template.format(prefix=random.choice(prefixes), title=title, url=url)
-
-def main():
-    if random.random() < OFF_DAY_CHANCE:
-        print(f"[{datetime.now()}] Off day — no tweets today.")
-        return
+    # Only title and url are read, so the pages' markdown is never kept.
+    r = httpclient.post(url, json=payload, headers=headers, stream=True)
+    results = read_response(r).get("data") or []
+    return [{"title": page.title, "url": page.url} for page in results]
 
+def queue_new_tweets(history, queue):
     queries = [
         "Agentic AI site:medium.com OR site:huggingface.co",
         "free AI courses site:deeplearning.ai OR site:coursera.org"
     ]
 
-    history = load_history()
-
     for query in queries:
-        for result in get_links(query):
-            if result['url'] in history:
+        with metrics.stage("search"):
+            results = get_links(query)
+        for result in results:
+            if result['url'] in history or result['url'] in queue:
                 continue
 
             tweet_text = make_tweet(result['title'], result['url'])
             if len(tweet_text) > 280:
                 tweet_text = tweet_text[:277] + "..."
 
-            delay = random.randint(60 * 60 * 4, 60 * 60 * 8)  # Wait 4–8 hours
-            print(f"Waiting {delay // 3600}h before posting: {tweet_text}")
-            time.sleep(delay)
+            due_at = queue.enqueue(tweet_text, result['url'])
+            if due_at:
+                print(f"🗓 Queued for {datetime.fromtimestamp(due_at):%Y-%m-%d %H:%M}: {tweet_text}")
 
-            if post_tweet(tweet_text):
-                history.append(result['url'])
-                save_history(history)
+def main():
+    parser = argparse.ArgumentParser(description="Find AI resources and post them to X on a human-like schedule.")
+    parser.add_argument("command", nargs="?", default="queue", choices=["queue", "run-due"],
+                        help="queue: find new links and schedule them (default); run-due: post whatever is due")
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
+    print("Firecrawl key loaded:", firecrawl_api_key is not None)
+    print("X token loaded:", bearer_token is not None)
+
+    with profiling.session(args.profile):
+        history = load_history()
+        queue = PostQueue(off_day_chance=OFF_DAY_CHANCE)
+
+        if args.command == "run-due":
+            posted = run_due(queue, XClient(bearer_token), history)
+            print(f"[{datetime.now()}] Posted {posted} due tweets, {queue.pending_count()} still queued.")
+        else:
+            queue_new_tweets(history, queue)
+        metrics.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,4 @@
+from tweetbot.campaigns import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared building blocks for the AI tweet bot entry points."""
@@ -0,0 +1,3 @@
+from tweetbot.engine import main
+
+main()
@@ -0,0 +1,202 @@
+"""End-to-end benchmarks of the entry points against local fake servers.
+
+Starts one ``FakeServer`` standing in for SerpAPI, Firecrawl and X (and,
+as an HTTP proxy, for the pages Scrapy fetches), then runs each entry
+point's ``main()`` in a fresh subprocess and scratch directory.  Each run
+reports wall time, requests issued per endpoint, bytes transferred and
+peak memory, and is appended as one JSON line to ``--output`` so results
+can be compared across commits:
+
+    python -m tweetbot.bench --queries 200 --history 100000 --repeat 2
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from tweetbot.fakes import FakeServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ("main", "main_safe", "main_safe_auto_serpapi", "main_safe_backup", "testy")
+BENCH_OUTPUT = "bench_results.jsonl"
+
+
+def seed_history(count, path):
+    """Pre-fill a history database with ``count`` synthetic URLs."""
+    from tweetbot.history import HistoryStore
+
+    history = HistoryStore(path, legacy_file=None)
+    for i in range(count):
+        history.append(f"https://history.example.com/post/{i}")
+    history.commit()
+    history.close()
+
+
+def run_entry(module, args):
+    """Drive one entry point the way its scheduled job would."""
+    if hasattr(module, "SEARCH_QUERIES") and args.queries:
+        module.SEARCH_QUERIES = [f"benchmark query {i}" for i in range(args.queries)]
+    if hasattr(module, "DAILY_TWEET_CAP") and args.cap:
+        module.DAILY_TWEET_CAP = args.cap
+
+    if module.__name__ != "main":
+        sys.argv = [module.__name__ + ".py"]
+        module.main()
+        return
+
+    # main.py queues tweets days ahead; post them all straight away.
+    from tweetbot.history import load_history
+    from tweetbot.scheduler import PostQueue, run_due
+    from tweetbot.xclient import XClient
+
+    sys.argv = ["main.py", "queue"]
+    module.main()
+    queue = PostQueue(off_day_chance=0)
+    run_due(queue, XClient(module.bearer_token), load_history(), now=time.time() + 365 * 24 * 3600)
+    queue.close()
+
+
+def child(args):
+    """Run one entry point in this process and write its measurements."""
+    sys.path.insert(0, ROOT)
+    if args.trace_memory:
+        tracemalloc.start()
+    error = None
+    started = time.perf_counter()
+    try:
+        run_entry(importlib.import_module(args.child), args)
+    except BaseException as e:  # SystemExit from a script's own checks included
+        error = repr(e)
+    wall = time.perf_counter() - started
+    result = {
+        "wall_s": round(wall, 4),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "error": error,
+    }
+    if args.trace_memory:
+        result["tracemalloc_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+    with open(args.result, "w") as f:
+        json.dump(result, f)
+
+
+def child_env(base_url, args):
+    env = dict(os.environ)
+    env.update({
+        "FIRECRAWL_KEY": "bench", "SERPAPI_KEY": "bench", "X_BEARER_TOKEN": "bench",
+        "FIRECRAWL_API_URL": base_url,
+        "SERPAPI_URL": f"{base_url}/search.json",
+        "X_API_URL": base_url,
+        "FIRECRAWL_POLL_INTERVAL": str(args.poll_interval),
+        # The fake host stands in for the API hosts, not for scraped sites.
+        "RATE_LIMITS": json.dumps({"127.0.0.1": 50}),
+        # Search results are plain http:// links; route them to the fake server.
+        "http_proxy": base_url, "HTTP_PROXY": base_url,
+        "no_proxy": "127.0.0.1,localhost", "NO_PROXY": "127.0.0.1,localhost",
+        "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")])),
+    })
+    return env
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench(args):
+    server = FakeServer(latency=args.latency, error_rate=args.error_rate, page_size=args.page_size,
+                        page_latency=args.page_latency, serp_results=args.serp_results,
+                        link_scheme="http", seed=args.seed)
+    base_url = server.start()
+    env = child_env(base_url, args)
+    commit = git_commit()
+    records = []
+    try:
+        for entry in args.entries:
+            with tempfile.TemporaryDirectory(prefix=f"bench-{entry}-") as workdir:
+                if args.history:
+                    seed_history(args.history, os.path.join(workdir, "tweet_history.db"))
+                for iteration in range(args.repeat):
+                    server.reset()
+                    tweets_before = len(server.tweets)
+                    result_file = os.path.join(workdir, "result.json")
+                    cmd = [sys.executable, "-m", "tweetbot.bench", "--child", entry, "--result", result_file,
+                           "--queries", str(args.queries), "--cap", str(args.cap)]
+                    if args.trace_memory:
+                        cmd.append("--trace-memory")
+                    output = None if args.verbose else subprocess.DEVNULL
+                    started = time.perf_counter()
+                    proc = subprocess.run(cmd, cwd=workdir, env=env, stdout=output, stderr=output)
+                    total = time.perf_counter() - started
+                    try:
+                        with open(result_file) as f:
+                            measured = json.load(f)
+                    except (OSError, ValueError):
+                        measured = {"error": f"child exited with {proc.returncode}"}
+                    record = {
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "commit": commit,
+                        "entry": entry,
+                        "iteration": iteration,
+                        "params": {k: getattr(args, k) for k in (
+                            "queries", "history", "cap", "latency", "error_rate",
+                            "page_size", "page_latency", "serp_results")},
+                        "process_s": round(total, 4),
+                        **measured,
+                        "requests": dict(server.requests),
+                        "requests_total": sum(server.requests.values()),
+                        "bytes_in": server.bytes_in,
+                        "bytes_out": server.bytes_out,
+                        "tweets_posted": len(server.tweets) - tweets_before,
+                    }
+                    records.append(record)
+                    print(f"⏱ {entry} #{iteration}: {record.get('wall_s', '?')}s, "
+                          f"{record['requests_total']} requests, {record['bytes_out'] // 1024} KiB in, "
+                          f"peak RSS {record.get('peak_rss_kb', '?')} KiB"
+                          + (f" ❌ {record['error']}" if record.get("error") else ""))
+    finally:
+        server.stop()
+
+    with open(args.output, "a") as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+    print(f"💾 Wrote {len(records)} results to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the entry points against local fake APIs.")
+    parser.add_argument("entries", nargs="*", default=list(ENTRY_POINTS), help="Entry points to run (default: all)")
+    parser.add_argument("--queries", type=int, default=0, help="Replace SEARCH_QUERIES with this many queries")
+    parser.add_argument("--history", type=int, default=0, help="Pre-seed history with this many URLs")
+    parser.add_argument("--cap", type=int, default=0, help="Override DAILY_TWEET_CAP")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per entry point, sharing caches")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every fake response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--page-size", type=int, default=2000, help="Characters of markdown per page")
+    parser.add_argument("--page-latency", type=float, default=0.01, help="Seconds per page in Firecrawl jobs")
+    parser.add_argument("--serp-results", type=int, default=50, help="Results available per query")
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="Firecrawl job poll interval")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="Also report tracemalloc peak (slower)")
+    parser.add_argument("--output", default=BENCH_OUTPUT, help="JSON-lines file results are appended to")
+    parser.add_argument("--verbose", action="store_true", help="Show the entry points' own output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Small persistent key/value cache with TTL, LRU eviction and a size budget.
+
+Values are JSON-serialisable objects stored zlib-compressed in a SQLite
+table.  The cache itself never decides freshness on lookup; callers pass
+a TTL (and optionally a stale window) to ``get_or_fetch``.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class DiskCache:
+    """SQLite-backed cache bounded by entry count and/or total bytes."""
+
+    def __init__(self, path, max_entries=None, max_bytes=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._refreshing = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def get(self, key):
+        """Return ``(value, stored_at)`` or None, marking the entry as recently used."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def set(self, key, value):
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, blob, now, now, len(blob)),
+            )
+            self._evict()
+
+    def _evict(self):
+        if self.max_entries:
+            self.conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        if self.max_bytes:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                victims = []
+                for key, size in self.conn.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed_at"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((key,))
+                    total -= size
+                self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def get_or_fetch(self, key, fetch, ttl, stale_ttl=0):
+        """Return a cached value younger than ``ttl`` or call ``fetch()``.
+
+        Entries older than ``ttl`` but within ``ttl + stale_ttl`` are served
+        immediately while a background thread refreshes them.  If ``fetch``
+        fails and any cached copy exists, that copy is returned instead.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            value, stored_at = cached
+            age = time.time() - stored_at
+            if age <= ttl:
+                self.count("hits")
+                return value
+            if age <= ttl + stale_ttl:
+                self.count("stale_hits")
+                self._refresh_in_background(key, fetch)
+                return value
+        self.count("misses")
+        try:
+            value = fetch()
+        except Exception:
+            if cached is not None:
+                return cached[0]
+            raise
+        self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, fetch):
+        def refresh():
+            try:
+                self.set(key, fetch())
+            except Exception as e:
+                print(f"⚠ Background refresh failed for {key}: {e}")
+
+        with self._lock:
+            if key in self._refreshing and self._refreshing[key].is_alive():
+                return
+            thread = threading.Thread(target=refresh, daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+
+    def wait(self):
+        """Block until background refreshes finish (call before exiting)."""
+        for thread in list(self._refreshing.values()):
+            thread.join()
+
+    def count(self, result):
+        """Count one lookup as ``hits``, ``stale_hits`` or ``misses``; safe across threads."""
+        with self._lock:
+            setattr(self, result, getattr(self, result) + 1)
+
+    def stats(self):
+        with self._lock:
+            hits, stale_hits, misses = self.hits, self.stale_hits, self.misses
+        lookups = hits + stale_hits + misses
+        return {
+            "hits": hits,
+            "stale_hits": stale_hits,
+            "misses": misses,
+            "hit_rate": (hits + stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.wait()
+        with self._lock:
+            self.conn.close()
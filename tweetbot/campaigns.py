@@ -0,0 +1,210 @@
+"""Run several topic campaigns (accounts) from one config, in parallel.
+
+Each campaign in ``campaigns.json`` has its own queries, trust/block
+lists, caps and the *names* of the environment variables holding its
+credentials:
+
+    {"campaigns": [{
+        "name": "ai-learning",
+        "queries": ["Agentic AI", "free AI courses"],
+        "trusted": ["medium.com", "deeplearning.ai"],
+        "blocked": ["reddit.com"],
+        "daily_tweet_cap": 3,
+        "credentials": {"serpapi": "SERPAPI_KEY", "firecrawl": "FIRECRAWL_KEY", "x": "X_BEARER_TOKEN"},
+        "post": false
+    }]}
+
+History, learned domains, near-duplicate signatures, query yield stats,
+run journals and the post queue live in the campaign's ``state_dir`` (default
+``state/<name>``), so accounts never see each other's posts.  The SerpAPI
+and content caches are SQLite files shared by every campaign: the same
+query or page fetched by two accounts is paid for once, and so is the
+circuit-breaker state of the sites being fetched.  Campaigns run on a
+process pool by default (one fresh process per campaign); ``--threads``
+runs them in one process, which also shares the HTTP connection pool and
+the per-domain rate limiter.
+"""
+import argparse
+import json
+import os
+import time
+from functools import partial
+from multiprocessing.pool import Pool, ThreadPool
+
+from tweetbot import engine, journal, profiling
+
+CAMPAIGNS_FILE = os.getenv("CAMPAIGNS_FILE", "campaigns.json")
+STATE_ROOT = os.getenv("CAMPAIGN_STATE_ROOT", "state")
+
+DEFAULTS = {
+    "trusted": [],
+    "blocked": [],
+    "learn_domains": True,  # Also use (and learn) results from domains not yet trusted
+    "daily_tweet_cap": 3,
+    "daily_new_domain_cap": 3,
+    "results_per_query": 10,
+    "serp_query_budget": None,  # SerpAPI calls per run; None = every due query
+    "rank": True,  # Score all candidates and fetch the best first
+    "rank_top_k": None,  # Candidates fetched at most when ranking; None = all, best first
+    "post": False,  # False: print what would be tweeted; True: queue for run-due
+    "credentials": {"serpapi": "SERPAPI_KEY", "firecrawl": "FIRECRAWL_KEY", "x": "X_BEARER_TOKEN"},
+}
+
+
+def load_campaigns(path=CAMPAIGNS_FILE, state_root=STATE_ROOT):
+    """Campaign definitions from ``path`` with defaults and state paths filled in."""
+    with open(path, "r") as f:
+        config = json.load(f)
+    campaigns = []
+    names = set()
+    for raw in config.get("campaigns", []):
+        if not raw.get("name") or not raw.get("queries"):
+            raise ValueError(f"Campaign needs a name and queries: {raw}")
+        if raw["name"] in names:
+            raise ValueError(f"Duplicate campaign name: {raw['name']}")
+        names.add(raw["name"])
+        campaign = {**DEFAULTS, **raw}
+        campaign["credentials"] = {**DEFAULTS["credentials"], **raw.get("credentials", {})}
+        campaign.setdefault("state_dir", os.path.join(state_root, raw["name"]))
+        campaigns.append(campaign)
+    return campaigns
+
+
+def state_path(campaign, filename):
+    return os.path.join(campaign["state_dir"], filename)
+
+
+def credential(campaign, service):
+    return os.getenv(campaign["credentials"][service])
+
+
+def run_campaign(campaign):
+    """Search, fetch, compose and emit for one campaign; returns a summary dict."""
+    name = campaign["name"]
+    started = time.perf_counter()
+    serpapi_key = credential(campaign, "serpapi")
+    firecrawl_key = credential(campaign, "firecrawl")
+    if not serpapi_key or not firecrawl_key:
+        print(f"❌ [{name}] Missing {campaign['credentials']['serpapi']} or {campaign['credentials']['firecrawl']}")
+        return {"campaign": name, "error": "missing credentials"}
+
+    os.makedirs(campaign["state_dir"], exist_ok=True)
+    queue = None
+    if campaign["post"]:
+        from tweetbot.scheduler import PostQueue
+
+        queue = PostQueue(state_path(campaign, "post_queue.db"))
+
+    def publish(tweet):
+        if queue is None:
+            print(f"📝 [{name}] WOULD TWEET: {tweet['text']}")
+            return True
+        due_at = queue.enqueue(tweet["text"], tweet["url"])
+        if due_at:
+            print(f"🗓 [{name}] Queued for {time.strftime('%Y-%m-%d %H:%M', time.localtime(due_at))}: {tweet['text']}")
+        return bool(due_at)
+
+    try:
+        summary = engine.Engine(
+            engine.make_search("serpapi", serpapi_key, num=campaign["results_per_query"]),
+            engine.make_fetch("firecrawl", firecrawl_key),
+            campaign["queries"],
+            trusted=campaign["trusted"],
+            blocked=campaign["blocked"],
+            domain_policy=engine.LEARN if campaign["learn_domains"] else engine.TRUSTED,
+            trusted_file=state_path(campaign, "trusted_domains.json"),
+            tweet_cap=campaign["daily_tweet_cap"],
+            new_domain_cap=campaign["daily_new_domain_cap"],
+            publish=publish,
+            history_db=state_path(campaign, "tweet_history.db"),
+            query_stats=state_path(campaign, "query_stats.db"),
+            query_budget=campaign["serp_query_budget"],
+            rank=campaign["rank"],
+            rank_top_k=campaign["rank_top_k"],
+            run_id=journal.run_id(name),
+            journal_dir=state_path(campaign, "journals"),
+            name=name,
+        ).run()
+    finally:
+        if queue is not None:
+            queue.close()
+    return {"campaign": name, **summary, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def post_due(campaign):
+    """Post whatever is due in one campaign's queue; returns a summary dict."""
+    from tweetbot.history import load_history
+    from tweetbot.scheduler import PostQueue, run_due
+    from tweetbot.xclient import XClient
+
+    name = campaign["name"]
+    token = credential(campaign, "x")
+    if not token:
+        print(f"❌ [{name}] Missing {campaign['credentials']['x']}")
+        return {"campaign": name, "error": "missing credentials"}
+    os.makedirs(campaign["state_dir"], exist_ok=True)
+    queue = PostQueue(state_path(campaign, "post_queue.db"))
+    history = load_history(state_path(campaign, "tweet_history.db"))
+    posted = run_due(queue, XClient(token), history)
+    summary = {"campaign": name, "posted": posted, "pending": queue.pending_count()}
+    queue.close()
+    history.close()
+    return summary
+
+
+def _safe(task, campaign, isolated=False):
+    try:
+        return task(campaign)
+    except Exception as e:
+        print(f"❌ [{campaign['name']}] {e.__class__.__name__}: {e}")
+        return {"campaign": campaign["name"], "error": repr(e)}
+    finally:
+        if isolated:
+            engine.finish()
+
+
+def run_all(campaigns, task=run_campaign, workers=None, threads=False):
+    """Run ``task(campaign)`` for every campaign; returns summaries as they finish.
+
+    Each campaign gets a fresh worker process, so its caches and metrics
+    are reported on their own.  With ``threads`` they share this process
+    and are reported once at the end.
+    """
+    workers = workers or min(len(campaigns), os.cpu_count() or 1)
+    if threads:
+        with ThreadPool(workers) as pool:
+            summaries = list(pool.imap_unordered(partial(_safe, task), campaigns))
+        engine.finish()
+        return summaries
+    with Pool(workers, maxtasksperchild=1) as pool:
+        return list(pool.imap_unordered(partial(_safe, task, isolated=True), campaigns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every campaign in a campaigns file in parallel.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "run-due"],
+                        help="run: search and queue/print tweets (default); run-due: post what is due")
+    parser.add_argument("--config", default=CAMPAIGNS_FILE)
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Run just these campaigns")
+    parser.add_argument("--workers", type=int, help="Parallel campaigns (default: one per CPU)")
+    parser.add_argument("--threads", action="store_true",
+                        help="Use threads in one process instead of a process pool")
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
+    campaigns = load_campaigns(args.config)
+    if args.only:
+        campaigns = [c for c in campaigns if c["name"] in args.only]
+    if not campaigns:
+        print("⚠ No campaigns to run")
+        return
+    task = post_due if args.command == "run-due" else run_campaign
+    # The profiler only sees this process, so profiled campaigns run on threads.
+    threads = args.threads or bool(args.profile)
+    with profiling.session(args.profile):
+        for summary in run_all(campaigns, task, args.workers, threads):
+            print(f"✅ {json.dumps(summary)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Local cache of Firecrawl page content keyed by canonical URL.
+
+A crawl or scrape is a paid full-page render, and candidates we skipped or
+failed to post come round again on later runs.  Responses are reduced to
+the fields the bot reads (title, url, rel=canonical and a bounded
+content excerpt) and kept in a size-capped LRU cache, so re-processing a
+URL inside its TTL costs no network call and no Firecrawl credit.
+"""
+import os
+import threading
+import time
+
+from tweetbot import metrics
+from tweetbot.cache import DiskCache
+from tweetbot.pages import EXCERPT_CHARS, Page, page_canonical
+from tweetbot.urls import url_fingerprint
+
+CONTENT_CACHE_DB = os.getenv("CONTENT_CACHE_DB", "content_cache.db")
+CONTENT_CACHE_TTL = float(os.getenv("CONTENT_CACHE_TTL", str(7 * 86400)))
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(CONTENT_CACHE_DB, max_bytes=CONTENT_CACHE_MAX_BYTES)
+    return _cache
+
+
+def compact_entry(entry, source):
+    """Reduce one Firecrawl page object (or ``Page``) to ``{"title", "url", "canonical", "content"}``."""
+    if isinstance(entry, Page):
+        return {"title": entry.title or "Untitled", "url": entry.url or source,
+                "canonical": entry.canonical, "content": entry.content}
+    if not isinstance(entry, dict):
+        return {"title": "Scraped Content", "url": source, "content": str(entry)[:EXCERPT_CHARS]}
+    metadata = entry.get("metadata") or {}
+    content = entry.get("content") or entry.get("markdown") or ""
+    return {
+        "title": entry.get("title") or metadata.get("title") or "Untitled",
+        "url": entry.get("url") or metadata.get("sourceURL") or source,
+        "canonical": entry.get("canonical") or page_canonical(metadata),
+        "content": content[:EXCERPT_CHARS],
+    }
+
+
+def compact_entries(data, source):
+    """Normalise any Firecrawl crawl/scrape response into a list of compact pages."""
+    if not data:
+        return []
+    payload = data.get("data")
+    if isinstance(payload, list):
+        return [compact_entry(entry, source) for entry in payload]
+    if isinstance(payload, (dict, Page)):
+        return [compact_entry(payload, source)]
+    if isinstance(payload, str) and payload:
+        return [{"title": "Scraped Content", "url": source, "content": payload[:EXCERPT_CHARS]}]
+    if data.get("markdown"):
+        return [{"title": "Scraped Content", "url": source, "content": data["markdown"][:EXCERPT_CHARS]}]
+    return []
+
+
+def lookup(source, ttl=CONTENT_CACHE_TTL):
+    """Cached compact pages for ``source`` if younger than ``ttl``, else None."""
+    cache = get_cache()
+    cached = cache.get(url_fingerprint(source))
+    if cached is not None and time.time() - cached[1] <= ttl:
+        cache.count("hits")
+        print(f"💾 Content cache hit for {source}")
+        return cached[0]
+    cache.count("misses")
+    return None
+
+
+def store(source, entries):
+    if entries:
+        get_cache().set(url_fingerprint(source), entries)
+
+
+def cached_fetch(source, fetch, ttl=CONTENT_CACHE_TTL):
+    """Return ``{"data": [pages]}`` for ``source``, calling ``fetch(source)`` on a miss.
+
+    Empty or failed responses are not cached, so they are retried next run.
+    """
+    entries = lookup(source, ttl)
+    if entries is None:
+        entries = compact_entries(fetch(source), source)
+        store(source, entries)
+    return {"data": entries} if entries else {}
+
+
+def finish():
+    if _cache is None:
+        return
+    stats = _cache.stats()
+    metrics.cache_stats("content", stats)
+    print(f"💾 Content cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
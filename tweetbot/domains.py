@@ -0,0 +1,130 @@
+"""Domain trust/block index with subdomain inheritance.
+
+``DomainIndex`` keeps domains in a trie of reversed labels, so a host
+inherits the verdict of its nearest listed ancestor.  Registrable domains
+come from a built-in suffix set, or from Mozilla's
+``public_suffix_list.dat`` next to the scripts (or at ``PUBLIC_SUFFIX_FILE``).
+"""
+import os
+from functools import lru_cache
+
+PUBLIC_SUFFIX_FILE = os.getenv("PUBLIC_SUFFIX_FILE", "public_suffix_list.dat")
+
+BUILTIN_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk",
+    "com.au", "net.au", "org.au", "edu.au",
+    "co.nz", "co.jp", "ne.jp", "co.in", "ac.in", "co.za", "co.kr",
+    "com.br", "com.cn", "com.mx", "com.sg", "com.tr", "com.tw", "com.hk",
+    "github.io", "gitlab.io", "blogspot.com", "wordpress.com", "herokuapp.com",
+    "netlify.app", "vercel.app", "pages.dev", "web.app", "firebaseapp.com",
+}
+
+TRUSTED = "trusted"
+BLOCKED = "blocked"
+
+
+def load_public_suffixes(path=PUBLIC_SUFFIX_FILE):
+    """Suffix rules from a public-suffix list file, or the built-in set."""
+    suffixes = set(BUILTIN_SUFFIXES)
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                rule = line.split("//", 1)[0].strip().lower()
+                if rule:
+                    suffixes.add(rule)
+    return suffixes
+
+
+@lru_cache(maxsize=None)
+def default_suffixes():
+    """The public-suffix rules, loaded once per process."""
+    return frozenset(load_public_suffixes())
+
+
+def _labels(host):
+    host = host.lower().strip().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host.split(".") if host else []
+
+
+def registrable_domain(host, suffixes=None):
+    """The public suffix plus one label, e.g. ``blog.example.co.uk`` → ``example.co.uk``."""
+    suffixes = default_suffixes() if suffixes is None else suffixes
+    labels = _labels(host)
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        wildcard = "*." + ".".join(labels[i + 1:])
+        if f"!{candidate}" in suffixes:
+            return candidate
+        if candidate in suffixes or wildcard in suffixes:
+            return ".".join(labels[i - 1:]) if i > 0 else candidate
+    return ".".join(labels[-2:])
+
+
+@lru_cache(maxsize=4096)
+def has_registrable_domain(host):
+    """Whether ``host`` is a registrable domain or below one (``amp.dev`` is; ``dev`` is not)."""
+    domain = registrable_domain(host)
+    return "." in domain and domain not in default_suffixes()
+
+
+class DomainIndex:
+    """Reversed-label trie mapping domains to a trust/block verdict."""
+
+    def __init__(self, suffixes=None):
+        self.suffixes = suffixes if suffixes is not None else default_suffixes()
+        self._root = {}
+        self._memo = {}
+
+    @classmethod
+    def build(cls, trusted=(), blocked=(), suffixes=None):
+        index = cls(suffixes)
+        for domain in trusted:
+            index.trust(domain)
+        for domain in blocked:
+            index.block(domain)
+        return index
+
+    def _mark(self, domain, verdict):
+        node = self._root
+        for label in reversed(_labels(domain)):
+            node = node.setdefault(label, {})
+        if node.get("") != BLOCKED:  # A block is never downgraded to trust
+            node[""] = verdict
+        self._memo.clear()
+
+    def trust(self, domain):
+        self._mark(domain, TRUSTED)
+
+    def block(self, domain):
+        self._mark(domain, BLOCKED)
+
+    def verdict(self, host):
+        """``BLOCKED`` if the host or any parent is blocked, else ``TRUSTED`` if
+        the host or any parent is trusted, else None."""
+        if host in self._memo:
+            return self._memo[host]
+        node = self._root
+        result = None
+        for label in reversed(_labels(host)):
+            node = node.get(label)
+            if node is None:
+                break
+            mark = node.get("")
+            if mark == BLOCKED:
+                result = BLOCKED
+                break
+            if mark == TRUSTED:
+                result = TRUSTED
+        self._memo[host] = result
+        return result
+
+    def is_trusted(self, host):
+        return self.verdict(host) == TRUSTED
+
+    def is_blocked(self, host):
+        return self.verdict(host) == BLOCKED
+
+    def registrable_domain(self, host):
+        return registrable_domain(host, self.suffixes)
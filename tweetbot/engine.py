@@ -0,0 +1,581 @@
+"""One search → fetch → compose → emit engine behind every entry point.
+
+``Engine`` runs ``tweetbot.pipeline`` with a search backend (``serpapi``,
+``firecrawl`` or ``google``) and a fetch backend (``firecrawl``,
+``scrapy`` or ``http``) chosen by name; each imports its client
+(requests, Scrapy, NumPy for ranking) only when used.
+"""
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from html.parser import HTMLParser
+from itertools import chain, islice
+from urllib.parse import quote
+
+from tweetbot.state import load_json, update_json
+
+DAILY_TWEET_CAP = 3
+DAILY_NEW_DOMAIN_CAP = 3  # Max new domains learned per run
+RESULTS_PER_QUERY = 10
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "4"))  # Queries searched at once
+
+# What to do with results from domains that are neither trusted nor blocked
+ANY = "any"  # Use them
+TRUSTED = "trusted"  # Drop them
+LEARN = "learn"  # Use them and trust their registrable domain from now on
+DOMAIN_POLICIES = (ANY, TRUSTED, LEARN)
+
+
+def require_keys(*names):
+    """Values of the environment variables ``names``; exits if any is missing."""
+    values = [os.getenv(name) for name in names]
+    for name, value in zip(names, values):
+        print(f"{name} loaded:", bool(value))
+    if not all(values):
+        print(f"❌ ERROR: Missing {' or '.join(names)}. Check GitHub Secrets.")
+        sys.exit(1)
+    return values
+
+
+# -- search backends -------------------------------------------------------
+
+
+class SerpApiSearch:
+    """Organic results; past ``page_size`` they are fetched as concurrent ``start`` pages."""
+
+    label = "SerpAPI"
+
+    def __init__(self, api_key, num=RESULTS_PER_QUERY, page_size=None):
+        from tweetbot import pipeline, serpapi
+
+        self.serpapi = serpapi
+        self.fan_out = pipeline.fan_out
+        self.api_key = api_key
+        self.num = num
+        self.page_size = page_size or serpapi.PAGE_SIZE
+
+    def __call__(self, query):
+        if self.num <= self.page_size:
+            data = self.serpapi.search(query, self.api_key, num=self.num)
+            return [res for res in data.get("organic_results", []) if res.get("link")]
+
+        def page(start):
+            return self.serpapi.search(query, self.api_key, num=self.page_size, start=start)
+
+        starts = range(0, self.num, self.page_size)
+        links = []
+        for start, data, error in self.fan_out(starts, page, len(starts)):
+            if error is not None:
+                if not links:
+                    raise error
+                break
+            results = data.get("organic_results", [])
+            links.extend(res for res in results if res.get("link"))
+            if len(results) < self.page_size:
+                break  # Last page; later pages are empty or repeat it
+        return links[:self.num]
+
+
+class FirecrawlSearch:
+    label = "Firecrawl search"
+
+    def __init__(self, api_key, num=RESULTS_PER_QUERY):
+        from tweetbot import firecrawl, httpclient, metrics
+
+        self.httpclient = httpclient
+        self.metrics = metrics
+        self.url = f"{firecrawl.FIRECRAWL_API_URL}/v1/search"
+        self.api_key = api_key
+        self.num = num
+
+    def __call__(self, query):
+        r = self.httpclient.post(self.url, json={"query": query, "limit": self.num},
+                                 headers={"Authorization": f"Bearer {self.api_key}"})
+        r.raise_for_status()
+        self.metrics.count("credits_total", api="firecrawl")
+        return [{"link": entry["url"], "title": entry.get("title", ""), "snippet": entry.get("description", "")}
+                for entry in r.json().get("data") or [] if entry.get("url")]
+
+
+class GoogleScrapeSearch:
+    """Links on a Google results page, scraped through Firecrawl."""
+
+    label = "Google"
+
+    def __init__(self, api_key, num=RESULTS_PER_QUERY):
+        from tweetbot import firecrawl, httpclient, metrics
+        from tweetbot.urls import extract_domain
+
+        self.httpclient = httpclient
+        self.metrics = metrics
+        self.url = f"{firecrawl.FIRECRAWL_API_URL}/v1/scrape"
+        self.extract_domain = extract_domain
+        self.api_key = api_key
+        self.num = num
+
+    def __call__(self, query):
+        # Raise on failure, like the other backends, so a failed scrape is not taken for no results.
+        r = self.httpclient.post(self.url, json={"url": f"https://www.google.com/search?q={quote(query)}",
+                                                 "formats": ["links"]},
+                                 headers={"Authorization": f"Bearer {self.api_key}"})
+        r.raise_for_status()
+        self.metrics.count("credits_total", api="firecrawl")
+        links = (r.json().get("data") or {}).get("links") or []
+        return [{"link": link} for link in links
+                if link.startswith("http") and "google." not in self.extract_domain(link)][:self.num]
+
+
+SEARCH_BACKENDS = {"serpapi": SerpApiSearch, "firecrawl": FirecrawlSearch, "google": GoogleScrapeSearch}
+SEARCH_KEYS = {"serpapi": "SERPAPI_KEY", "firecrawl": "FIRECRAWL_KEY", "google": "FIRECRAWL_KEY"}
+
+
+# -- fetch backends --------------------------------------------------------
+
+
+class FirecrawlFetch:
+    """Firecrawl batch-scrape jobs, falling back to single scrapes."""
+
+    def __init__(self, api_key):
+        from tweetbot import firecrawl
+
+        self.firecrawl = firecrawl
+        self.manager = firecrawl.CrawlJobManager(api_key)
+
+    def __call__(self, urls, budget):
+        return self.firecrawl.fetch_pages(urls, self.manager, fallback=self.manager.scrape,
+                                          chunk_size=lambda: budget.remaining)
+
+    def close(self):
+        pass
+
+
+class ScrapyFetch:
+    """Pages scraped by one background Scrapy engine (no API key needed)."""
+
+    def __init__(self, max_in_flight=None):
+        from tweetbot.scrapy_engine import ScrapyEngine
+        from tweetbot.urls import extract_domain
+
+        self.ScrapyEngine = ScrapyEngine
+        self.extract_domain = extract_domain
+        self.max_in_flight = max_in_flight
+        self.engine = None
+
+    def __call__(self, urls, budget):
+        # Hand Scrapy no more pages at once than the run can still post.
+        self.engine = self.ScrapyEngine(max_in_flight=self.max_in_flight or budget.remaining)
+        for source, item in self.engine.scrape(urls):
+            if item.get("status") == 429:
+                # The engine reports it to the limiter; the breaker parks the domain if it persists.
+                print(f"⏳ {self.extract_domain(source)} is throttling us (429), backing off")
+                continue
+            if not item.get("url"):
+                print(f"⚠ No scrape data for {source} (status {item.get('status')}"
+                      f"{', ' + item['error'] if item.get('error') else ''}), skipping...")
+                continue
+            yield source, {"data": [item]}
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.stop()
+
+
+class _PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.title = ""
+        self.canonical = None
+        self.text = []
+        self._in = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("title", "script", "style"):
+            self._in = tag
+        elif tag == "link" and self.canonical is None:
+            attrs = dict(attrs)
+            if "canonical" in (attrs.get("rel") or "").lower().split():
+                self.canonical = attrs.get("href")
+
+    def handle_endtag(self, tag):
+        if tag == self._in:
+            self._in = None
+
+    def handle_data(self, data):
+        if self._in == "title":
+            self.title += data
+        elif self._in is None and data.strip():
+            self.text.append(data.strip())
+
+
+class HttpFetch:
+    """Plain concurrent GETs through the shared HTTP client, HTML parsed locally."""
+
+    def __init__(self):
+        from tweetbot import content_cache, fetch, httpclient
+
+        self.content_cache = content_cache
+        self.httpclient = httpclient
+        self.fetch = fetch
+
+    def page(self, url):
+        r = self.httpclient.get(url)
+        print(f"🌐 Fetching {url} → status: {r.status_code}")
+        if r.status_code != 200 or "html" not in r.headers.get("Content-Type", "html"):
+            return {}
+        parser = _PageParser()
+        parser.feed(r.text)
+        return {"data": {
+            "title": re.sub(r"\s+", " ", parser.title).strip() or "Untitled",
+            "url": r.url,
+            "canonical": parser.canonical,
+            "content": " ".join(parser.text),
+        }}
+
+    def __call__(self, urls, budget):
+        # Candidates are pulled here, a chunk at a time, so the history
+        # lookups upstream stay on this thread.
+        urls = iter(urls)
+        while True:
+            chunk = list(islice(urls, budget.remaining or self.fetch.FETCH_CONCURRENCY))
+            if not chunk:
+                return
+            yield from self.fetch.fetch_iter(chunk, lambda url: self.content_cache.cached_fetch(url, self.page))
+
+    def close(self):
+        pass
+
+
+FETCH_BACKENDS = {"firecrawl": FirecrawlFetch, "scrapy": ScrapyFetch, "http": HttpFetch}
+FETCH_KEYS = {"firecrawl": "FIRECRAWL_KEY", "scrapy": None, "http": None}
+
+
+def make_search(name, api_key=None, **options):
+    """Build search backend ``name`` (a callable returning result dicts for a query)."""
+    return SEARCH_BACKENDS[name](api_key, **options)
+
+
+def make_fetch(name, api_key=None, **options):
+    """Build fetch backend ``name``; ``api_key`` is ignored by backends without one."""
+    if FETCH_KEYS[name]:
+        return FETCH_BACKENDS[name](api_key, **options)
+    return FETCH_BACKENDS[name](**options)
+
+
+# -- engine ----------------------------------------------------------------
+
+
+def _print_tweet(tweet):
+    print(f"📝 WOULD TWEET: {tweet['text']}")
+    return True
+
+
+class Engine:
+    """Search ``queries``, fetch what is new and publish up to ``tweet_cap`` tweets.
+
+    ``trusted`` and ``blocked`` seed the domain index; domains learned
+    under the ``learn`` policy are kept in ``trusted_file``.  ``publish``
+    receives each tweet dict and returns True once it is out (or queued);
+    the default prints it.  With ``query_stats`` (a database path) only
+    the queries ``tweetbot.query_stats`` considers due are searched, at
+    most ``query_budget`` of them.
+
+    Up to ``search_concurrency`` queries are searched at once; candidates
+    still come out in query order, then rank order, so a run is
+    reproducible.  Each tweet carries ``found_by``, the ``(query, rank)``
+    pairs of every search that surfaced its URL.
+
+    With ``rank`` every due query is searched first and the unseen
+    candidates are scored together (``tweetbot.ranking``); only the best
+    ``rank_top_k`` of them are fetched, best first.
+
+    With ``run_id`` each stage's output is checkpointed in a
+    ``tweetbot.journal`` under ``journal_dir``; running again with the
+    same ID replays the searches, ranking, pages and tweets it already
+    has instead of paying for them twice.
+    """
+
+    def __init__(self, search, fetch, queries, trusted=(), blocked=(), domain_policy=LEARN,
+                 trusted_file=None, tweet_cap=DAILY_TWEET_CAP, new_domain_cap=DAILY_NEW_DOMAIN_CAP,
+                 make_tweet=None, publish=_print_tweet, history_db=None, name=None,
+                 query_stats=None, query_budget=None, search_concurrency=SEARCH_CONCURRENCY,
+                 rank=False, rank_top_k=None, rank_weights=None, run_id=None, journal_dir=None):
+        if domain_policy not in DOMAIN_POLICIES:
+            raise ValueError(f"Unknown domain policy: {domain_policy}")
+        self.search = search
+        self.fetch = fetch
+        self.queries = list(queries)
+        self.trusted = list(trusted)
+        self.blocked = list(blocked)
+        self.domain_policy = domain_policy
+        self.trusted_file = trusted_file
+        self.tweet_cap = tweet_cap
+        self.new_domain_cap = new_domain_cap
+        self.make_tweet = make_tweet
+        self.publish = publish
+        self.history_db = history_db
+        self.prefix = f"[{name}] " if name else ""
+        self.query_stats = query_stats
+        self.query_budget = query_budget
+        self.search_concurrency = search_concurrency
+        self.rank = rank
+        self.rank_top_k = rank_top_k
+        self.rank_weights = rank_weights
+        self.run_id = run_id
+        self.journal_dir = journal_dir
+
+    def load_trusted(self):
+        learned = load_json(self.trusted_file, []) if self.trusted_file else []
+        return sorted(set(self.trusted + learned))
+
+    def save_learned(self, domains):
+        """Add ``domains`` to ``trusted_file``, keeping what other runs added meanwhile."""
+        if self.trusted_file:
+            update_json(self.trusted_file, [],
+                        lambda saved: sorted((set(saved) | set(domains)) - set(self.trusted)))
+
+    def ranked(self, urls, domains, history, provenance, serp_results):
+        """The best ``rank_top_k`` of ``urls`` by ``tweetbot.ranking``, best first."""
+        from tweetbot import ranking
+        from tweetbot.domains import DomainIndex
+        from tweetbot.urls import extract_domain, url_fingerprint
+
+        now = time.time()
+        base = DomainIndex.build(trusted=self.trusted)
+        last_posted = {}
+        for url, added_at in history.recent(now - ranking.RECENCY_WINDOW * 86400):
+            domain = domains.registrable_domain(extract_domain(url))
+            last_posted[domain] = max(added_at, last_posted.get(domain, 0))
+        candidates = []
+        for url in urls:
+            fp = url_fingerprint(url)
+            host = extract_domain(url)
+            domain = domains.registrable_domain(host)
+            found_by = provenance[fp]
+            candidates.append({
+                "url": url,
+                "domain": domain,
+                "best_rank": min(rank for _, rank in found_by),
+                "queries": len({query for query, _ in found_by}),
+                "trust": (ranking.TRUSTED if base.is_trusted(host)
+                          else ranking.LEARNED if domains.is_trusted(host) else ranking.UNKNOWN),
+                "last_posted": last_posted.get(domain),
+                "result": serp_results[fp],
+            })
+        best = ranking.top_k(candidates, self.rank_top_k, self.rank_weights, now)
+        print(f"🏅 {self.prefix}Ranked {len(candidates)} candidates, fetching the top {len(best)}")
+        return best
+
+    def run(self):
+        """Run the pipeline once; returns ``{"tweets": n, "new_domains": [...]}``."""
+        from tweetbot import metrics, pipeline
+        from tweetbot.domains import DomainIndex
+        from tweetbot.history import HISTORY_DB, load_history
+        from tweetbot.neardup import NearDuplicateIndex
+        from tweetbot.tweets import make_tweet
+        from tweetbot.urls import extract_domain, url_fingerprint
+
+        history = load_history(self.history_db or HISTORY_DB)
+        near_dups = NearDuplicateIndex(self.history_db or HISTORY_DB)
+        trusted = self.load_trusted()
+        domains = DomainIndex.build(trusted=trusted, blocked=self.blocked)
+        newly_trusted = set()
+        provenance = defaultdict(list)
+        serp_results = {}
+        budget = pipeline.Budget(self.tweet_cap)
+        journal = None
+        searched_before, fetched_before, composed, published = {}, {}, {}, {}
+        if self.run_id:
+            from tweetbot.journal import JOURNAL_DIR, Journal
+
+            journal = Journal(self.run_id, self.journal_dir or JOURNAL_DIR)
+            searched_before = journal.load("search")
+            fetched_before = journal.load("fetch")
+            composed = journal.load("tweet")
+            published = journal.load("publish")
+            if journal.resumed:
+                print(f"↩ {self.prefix}Resuming run {self.run_id} from its journal: {journal.counts()}")
+            # Tweets posted and recorded before the restart count against this run's cap;
+            # one posted but not yet recorded is counted when its replay is emitted.
+            budget.used = sum(url in history for url in published)
+        queries = journal.get("plan", "queries") if journal else None
+        stats = None
+        if self.query_stats:
+            from tweetbot.query_stats import SERP_QUERY_BUDGET, QueryStats
+
+            stats = QueryStats(self.query_stats)
+        if queries is None:
+            queries = self.queries
+            if stats is not None:
+                queries = stats.select(self.queries, self.query_budget or SERP_QUERY_BUDGET)
+                if len(queries) < len(self.queries):
+                    print(f"🗓 {self.prefix}Searching {len(queries)} of {len(self.queries)} queries; "
+                          f"the rest are not due or over budget")
+            if journal:
+                journal.put("plan", "queries", queries)
+
+        def search_one(query):
+            if query in searched_before:
+                return searched_before[query]
+            return self.search(query)
+
+        def filtered(results):
+            for query, found in results:
+                if query in searched_before:
+                    print(f"↩ {self.prefix}Replayed search from journal: {query}")
+                else:
+                    print(f"🔎 {self.prefix}Searched via {self.search.label}: {query}")
+                    if journal:
+                        journal.put("search", query, found)
+                yield from filter_links(query, found, record=query not in searched_before)
+
+        def filter_links(query, found, record=True):
+            urls = []
+            new_domains = set()
+            for rank, result in enumerate(found, 1):
+                link = result["link"]
+                fp = url_fingerprint(link)
+                provenance[fp].append((query, rank))
+                serp_results.setdefault(fp, result)
+                domain = extract_domain(link)
+                if domains.is_blocked(domain):
+                    continue
+                if self.domain_policy == ANY or domains.is_trusted(domain):
+                    urls.append(link)
+                elif self.domain_policy == LEARN:
+                    candidate = domains.registrable_domain(domain)
+                    if candidate not in newly_trusted and candidate not in new_domains:
+                        print(f"✨ New candidate domain found: {candidate}")
+                    new_domains.add(candidate)
+                    urls.append(link)
+            unseen = sum(url not in history for url in urls)
+            print(f"   Found {len(urls)} links, {unseen} unseen ({len(new_domains)} new domains)")
+            newly_trusted.update(new_domains)
+            if stats is not None and record:
+                stats.record(query, [result["link"] for result in found], unseen)
+            return urls
+
+        def checkpointed(results):
+            # Pages fetched before the restart (and not yet posted) come first.  Each new page
+            # is journaled before it is yielded, so a run killed while composing or posting
+            # it replays the page on resume instead of fetching it again.
+            for source, data in chain(((s, d) for s, d in fetched_before.items() if s not in history), results):
+                if journal and source not in fetched_before:
+                    journal.put("fetch", source, data)
+                yield source, data
+
+        def compose_tweet(title, url):
+            if url not in composed:
+                composed[url] = (self.make_tweet or make_tweet)(title, url)
+                if journal:
+                    journal.put("tweet", url, composed[url])
+            return composed[url]
+
+        def publish(tweet):
+            tweet["found_by"] = provenance[url_fingerprint(tweet["source"])]
+            metrics.event("candidate", url=tweet["url"], found_by=tweet["found_by"])
+            if tweet["url"] in published:
+                print(f"↩ {self.prefix}Already published before the restart: {tweet['url']}")
+                return True
+            sent = self.publish(tweet)
+            if sent and journal:
+                journal.put("publish", tweet["url"], True)
+            return sent
+
+        # Each stage pulls lazily, so hitting the cap stops searching and fetching
+        # (ranking has to see every candidate first, so it searches every due query).
+        try:
+            searched = pipeline.search(queries, search_one, self.search_concurrency)
+            candidates = pipeline.unseen(filtered(searched), history)
+            if self.rank:
+                candidates = list(candidates)
+                ranked_before = journal.get("rank", "top") if journal else None
+                if ranked_before is not None:
+                    candidates = list(pipeline.unseen(ranked_before, history))
+                else:
+                    with metrics.stage("rank"):
+                        candidates = self.ranked(candidates, domains, history, provenance, serp_results)
+                    if journal:
+                        journal.put("rank", "top", candidates)
+            fresh = (url for url in candidates if url not in fetched_before)
+            results = checkpointed(self.fetch(fresh, budget))
+            tweets = pipeline.compose(results, compose_tweet, history, near_dups)
+            if budget.exhausted:
+                print(f"⏹ {self.prefix}Daily tweet cap of {budget.cap} was reached before the restart")
+            else:
+                pipeline.emit(tweets, publish, budget, history, near_dups)
+            if journal:
+                journal.complete()
+        finally:
+            self.fetch.close()
+            history.close()
+            near_dups.close()
+            if stats is not None:
+                stats.close()
+            if journal:
+                journal.close()
+
+        learned = sorted(newly_trusted)[:self.new_domain_cap]
+        if learned:
+            print(f"🧠 {self.prefix}Learning {len(learned)} new domains today: {learned}")
+            self.save_learned(learned)
+        return {"tweets": budget.used, "new_domains": learned}
+
+
+def finish():
+    """Save limiter state and report cache and run metrics for whatever this process used."""
+    for name in ("tweetbot.serpapi", "tweetbot.content_cache", "tweetbot.ratelimit", "tweetbot.metrics"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.finish()
+
+
+def main(argv=None):
+    import argparse
+
+    from tweetbot import profiling
+
+    parser = argparse.ArgumentParser(prog="python -m tweetbot",
+                                     description="Find AI resources and print the tweets they would make.")
+    parser.add_argument("queries", nargs="+", help="Search queries")
+    parser.add_argument("--search", choices=sorted(SEARCH_BACKENDS), default="serpapi")
+    parser.add_argument("--fetch", choices=sorted(FETCH_BACKENDS), default="firecrawl")
+    parser.add_argument("--trusted", nargs="*", default=[], metavar="DOMAIN")
+    parser.add_argument("--blocked", nargs="*", default=[], metavar="DOMAIN")
+    parser.add_argument("--domain-policy", choices=DOMAIN_POLICIES, default=LEARN,
+                        help="What to do with results from unlisted domains (default: learn)")
+    parser.add_argument("--trusted-file", default="trusted_domains.json",
+                        help="Where learned domains are kept")
+    parser.add_argument("--cap", type=int, default=DAILY_TWEET_CAP, help="Tweets per run")
+    parser.add_argument("--results", type=int, default=RESULTS_PER_QUERY, help="Search results per query")
+    parser.add_argument("--concurrency", type=int, default=SEARCH_CONCURRENCY, help="Queries searched at once")
+    parser.add_argument("--query-stats", metavar="DB",
+                        help="Only search queries that are due by their past yield, tracked in DB")
+    parser.add_argument("--rank", action="store_true",
+                        help="Score all candidates before fetching and fetch the best first")
+    parser.add_argument("--top-k", type=int, help="With --rank, fetch at most this many candidates")
+    parser.add_argument("--run-id", help="Checkpoint the run under this ID and resume it if it was cut short")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    names = list(dict.fromkeys(name for name in (SEARCH_KEYS[args.search], FETCH_KEYS[args.fetch]) if name))
+    keys = dict(zip(names, require_keys(*names)))
+    with profiling.session(args.profile):
+        engine = Engine(
+            make_search(args.search, keys[SEARCH_KEYS[args.search]], num=args.results),
+            make_fetch(args.fetch, keys.get(FETCH_KEYS[args.fetch])),
+            args.queries,
+            trusted=args.trusted,
+            blocked=args.blocked,
+            domain_policy=args.domain_policy,
+            trusted_file=args.trusted_file,
+            tweet_cap=args.cap,
+            query_stats=args.query_stats,
+            search_concurrency=args.concurrency,
+            rank=args.rank,
+            rank_top_k=args.top_k,
+            run_id=args.run_id,
+        )
+        engine.run()
+        finish()
@@ -0,0 +1,293 @@
+"""Local stand-in servers for exercising the bot without live API keys.
+
+``FakeServer`` speaks enough of the Firecrawl API (``/v1/scrape``,
+``/v1/crawl`` and ``/v1/batch/scrape`` with job polling), SerpAPI
+(``/search.json`` with ``num``/``start`` paging) and X (``POST /2/tweets``
+with rate-limit headers and duplicate rejection, plus the timeline) for
+the job manager and entry points to run against it.  It also answers
+as an HTTP proxy, serving an HTML page for any absolute ``http://`` URL, so
+Scrapy can "fetch" the search results too.  Latency, error rate, result
+counts and page size are configurable, and every request is counted.
+
+    with FakeServer(latency=0.05) as base_url:
+        os.environ["FIRECRAWL_API_URL"] = base_url
+        os.environ["SERPAPI_URL"] = base_url + "/search.json"
+        os.environ["X_API_URL"] = base_url
+        ...
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from urllib.parse import parse_qs, urlsplit
+
+DOMAINS = (
+    "medium.com", "towardsdatascience.com", "deeplearning.ai", "coursera.org", "edx.org",
+    "classcentral.com", "arxiv.org", "openai.com", "blog.example.com", "news.example.org",
+)
+
+
+class FakeServer:
+    """Threaded HTTP server with canned API responses and request counters."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, page_size=2000, page_latency=0.05, seed=0,
+                 serp_results=50, domains=DOMAINS, link_scheme="https", tweet_limit=50, tweet_window=900):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.page_latency = page_latency
+        self.serp_results = serp_results
+        self.domains = domains
+        self.link_scheme = link_scheme
+        self.random = random.Random(seed)
+        self.jobs = {}
+        self.tweets = []
+        self.tweet_limit = tweet_limit
+        self.tweet_window = tweet_window
+        self._window_start = time.time()
+        self._window_used = 0
+        self._tweet_ids = count(1)
+        self.requests = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        """Clear counters between measured runs."""
+        with self._lock:
+            self.requests.clear()
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    # -- plumbing ----------------------------------------------------------
+
+    def _handle(self, handler, method):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        path, _, query = handler.path.partition("?")
+        with self._lock:
+            self.requests[f"{method} {self._route_name(path)}"] += 1
+            self.bytes_in += len(body) + len(handler.requestline)
+            fail = self.random.random() < self.error_rate
+
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            return self._send(handler, 503, {"error": "injected failure"}, {"Retry-After": "0"})
+
+        payload = json.loads(body) if body else {}
+        status, data, headers = self.route(method, path, query, payload, handler.headers)
+        self._send(handler, status, data, headers)
+
+    def _send(self, handler, status, data, headers=None):
+        if isinstance(data, str):
+            raw, content_type = data.encode("utf-8"), "text/html; charset=utf-8"
+        else:
+            raw, content_type = json.dumps(data).encode("utf-8"), "application/json"
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(raw)
+        with self._lock:
+            self.bytes_out += len(raw)
+
+    @staticmethod
+    def _route_name(path):
+        if path.startswith("http://"):
+            return "proxied page"
+        # Collapse job ids so counters group by endpoint.
+        for prefix in ("/v1/batch/scrape/", "/v1/crawl/"):
+            if path.startswith(prefix):
+                return prefix + "{id}"
+        return path
+
+    def route(self, method, path, query, payload, headers):
+        """Dispatch a request; returns ``(status, body, extra_headers)``.
+
+        ``body`` is JSON-encoded unless it is a string, which is sent as HTML.
+        """
+        if method == "GET" and path.startswith("http://"):
+            return 200, self.html_page(path + (f"?{query}" if query else "")), {}
+        if method == "GET" and path == "/search.json":
+            return 200, self.search(parse_qs(query)), {}
+        if method == "POST" and path == "/2/tweets":
+            return self._post_tweet(payload)
+        if method == "GET" and path == "/2/users/me":
+            return 200, {"data": {"id": "1", "username": "fakebot"}}, {}
+        if method == "GET" and path == "/2/users/1/tweets":
+            limit = int(parse_qs(query).get("max_results", ["10"])[0])
+            return 200, {"data": list(reversed(self.tweets))[:limit]}, {}
+        if method == "POST" and path == "/v1/scrape" and "query" in payload:
+            return 200, self._search_scrape(payload), {}
+        if method == "POST" and path == "/v1/scrape":
+            return 200, {"success": True, "data": self._scrape(payload)}, {}
+        if method == "POST" and path == "/v1/search":
+            links = self.links(payload["query"], 0, int(payload.get("limit", 5)))
+            return 200, {"success": True, "data": [{"title": title, "url": url} for title, url in links]}, {}
+        if method == "POST" and path == "/v1/batch/scrape":
+            return 200, self._create_job("batch/scrape", payload["urls"]), {}
+        if method == "POST" and path == "/v1/crawl":
+            return 200, self._create_job("crawl", [payload["url"]]), {}
+        if method == "GET" and path.startswith(("/v1/batch/scrape/", "/v1/crawl/")):
+            return self._job_status(path.rsplit("/", 1)[-1])
+        return 404, {"error": f"no route for {method} {path}"}, {}
+
+    # -- Firecrawl ---------------------------------------------------------
+
+    def page(self, url):
+        words = ("agentic", "models", "prompting", "course", "tutorial", "free", "ai", "learn")
+        rng = random.Random(url)
+        markdown = " ".join(rng.choice(words) for _ in range(self.page_size // 6))
+        return {
+            "markdown": markdown[: self.page_size],
+            "metadata": {"title": f"Article about {url.rsplit('/', 1)[-1] or url}", "sourceURL": url,
+                         "ogUrl": url, "statusCode": 200},
+        }
+
+    def html_page(self, url):
+        page = self.page(url)
+        return (
+            f"<html><head><title>{escape(page['metadata']['title'])}</title>"
+            f'<link rel="canonical" href="{escape(url)}"></head>'
+            f"<body><p>{escape(page['markdown'])}</p></body></html>"
+        )
+
+    def _scrape(self, payload):
+        page = self.page(payload["url"])
+        if "links" in payload.get("formats", []):
+            # A scraped results page links to that query's results.
+            query = parse_qs(urlsplit(payload["url"]).query).get("q", [""])[0]
+            page["links"] = [url for _, url in self.links(query, 0, 10)] if query else []
+        return page
+
+    def _search_scrape(self, payload):
+        # The query-style /v1/scrape call main.py makes.
+        links = self.links(payload["query"], 0, int(payload.get("maxResults", 5)))
+        return {"success": True, "data": [{"title": title, "url": url, **self.page(url)} for title, url in links]}
+
+    def _create_job(self, kind, urls):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.jobs[job_id] = {"kind": kind, "urls": list(urls), "created": time.monotonic()}
+        return {"success": True, "id": job_id, "url": f"{self.base_url}/v1/{kind}/{job_id}"}
+
+    def _job_status(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return 404, {"success": False, "error": "unknown job"}, {}
+        elapsed = time.monotonic() - job["created"]
+        done = len(job["urls"]) if not self.page_latency else min(len(job["urls"]), int(elapsed / self.page_latency))
+        status = "completed" if done == len(job["urls"]) else "scraping"
+        return 200, {
+            "success": True,
+            "status": status,
+            "total": len(job["urls"]),
+            "completed": done,
+            "creditsUsed": done,
+            "data": [self.page(url) for url in job["urls"][:done]],
+        }, {}
+
+    # -- SerpAPI -----------------------------------------------------------
+
+    def links(self, query, start, num):
+        """Deterministic ``(title, url)`` results ``start..start+num`` for a query."""
+        rng = random.Random(query)
+        slug = "-".join(query.lower().split()) or "results"
+        results = []
+        for position in range(start, min(start + num, self.serp_results)):
+            domain = self.domains[(rng.randrange(len(self.domains)) + position) % len(self.domains)]
+            results.append((f"{query} #{position + 1}", f"{self.link_scheme}://{domain}/{slug}/{position}"))
+        return results
+
+    def search(self, params):
+        query = params.get("q", [""])[0]
+        start = int(params.get("start", ["0"])[0])
+        num = int(params.get("num", ["10"])[0])
+        return {
+            "search_metadata": {"status": "Success"},
+            "search_parameters": {"q": query, "start": start, "num": num},
+            "organic_results": [
+                {"position": start + i + 1, "title": title, "link": url,
+                 "snippet": f"Snippet for {title}", "displayed_link": urlsplit(url).netloc}
+                for i, (title, url) in enumerate(self.links(query, start, num))
+            ],
+        }
+
+    # -- X -----------------------------------------------------------------
+
+    def _post_tweet(self, payload):
+        text = payload.get("text", "")
+        with self._lock:
+            now = time.time()
+            if now >= self._window_start + self.tweet_window:
+                self._window_start, self._window_used = now, 0
+            reset = self._window_start + self.tweet_window
+            if self._window_used >= self.tweet_limit:
+                status, body = 429, {"title": "Too Many Requests", "detail": "Too Many Requests", "status": 429}
+            elif not text or len(text) > 280:
+                status, body = 400, {"title": "Invalid Request", "detail": "text must be 1-280 characters"}
+            elif any(tweet["text"] == text for tweet in self.tweets):
+                self._window_used += 1
+                status, body = 403, {"title": "Forbidden", "status": 403,
+                                     "detail": "You are not allowed to create a Tweet with duplicate content."}
+            else:
+                self._window_used += 1
+                tweet_id = str(next(self._tweet_ids))
+                self.tweets.append({"id": tweet_id, "text": text})
+                status, body = 201, {"data": {"id": tweet_id, "text": text}}
+            headers = {
+                "x-rate-limit-limit": str(self.tweet_limit),
+                "x-rate-limit-remaining": str(max(0, self.tweet_limit - self._window_used)),
+                "x-rate-limit-reset": str(int(reset)),
+            }
+        return status, body, headers
@@ -0,0 +1,152 @@
+"""Concurrent fetch engine for the crawl-then-scrape step.
+
+Fetching candidates one after another made a run's wall time the sum of
+every Firecrawl round trip.  ``fetch_concurrently`` keeps up to
+``concurrency`` fetches in flight (at most ``per_domain`` against any one
+site) and yields ``(url, result)`` pairs as they complete.  The scripts are
+synchronous, so ``fetch_iter`` drives it from a background event loop and
+hands results back as a plain iterator.
+"""
+import asyncio
+import os
+import queue
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from tweetbot.urls import extract_domain
+
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+PER_DOMAIN_CONCURRENCY = int(os.getenv("PER_DOMAIN_CONCURRENCY", "2"))
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+async def fetch_concurrently(urls, fetch_one, concurrency=FETCH_CONCURRENCY,
+                             per_domain=PER_DOMAIN_CONCURRENCY, stop=None):
+    """Run blocking ``fetch_one(url)`` calls concurrently, yielding as they finish.
+
+    ``urls`` may be any iterator; it is only advanced when a slot frees up,
+    so a lazy upstream is never drained further than needed.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    urls = iter(urls)
+    active = defaultdict(int)
+    deferred = deque()
+    in_flight = {}
+    exhausted = False
+
+    def call(url):
+        try:
+            return fetch_one(url)
+        except Exception as e:
+            print(f"❌ Fetch error for {url}: {e}")
+            return {}
+
+    def start(url, domain):
+        active[domain] += 1
+        task = loop.run_in_executor(executor, call, url)
+        in_flight[task] = (url, domain)
+
+    def next_ready():
+        for _ in range(len(deferred)):
+            url, domain = deferred.popleft()
+            if active[domain] < per_domain:
+                return url, domain
+            deferred.append((url, domain))
+        return None
+
+    try:
+        while True:
+            while len(in_flight) < concurrency and not (stop and stop.is_set()):
+                ready = next_ready()
+                if ready:
+                    start(*ready)
+                    continue
+                if exhausted or len(deferred) >= concurrency * 4:
+                    break
+                url = await loop.run_in_executor(None, next, urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                domain = extract_domain(url)
+                if active[domain] < per_domain:
+                    start(url, domain)
+                else:
+                    deferred.append((url, domain))
+
+            if not in_flight:
+                return
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url, domain = in_flight.pop(task)
+                active[domain] -= 1
+                yield url, task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_async(agen_factory, maxsize=FETCH_CONCURRENCY):
+    """Drive the async generator returned by ``agen_factory(stop)`` from a
+    background event loop and expose its items as a synchronous iterator.
+
+    ``stop`` is a ``threading.Event`` set when the consumer closes the
+    iterator early (e.g. on ``break``); producers should stop starting new
+    work once it is set.
+    """
+    results = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    async def drive():
+        async for item in agen_factory(stop):
+            put(item)
+            if stop.is_set():
+                break
+
+    def run():
+        try:
+            asyncio.run(drive())
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            put(_DONE)
+
+    threading.Thread(target=run, name="fetch-loop", daemon=True).start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+def fetch_iter(urls, fetch_one, concurrency=FETCH_CONCURRENCY, per_domain=PER_DOMAIN_CONCURRENCY):
+    """Synchronous iterator over ``fetch_concurrently`` results.
+
+    Closing the iterator early stops new fetches from being started;
+    fetches already in flight are abandoned.
+    """
+    return iter_async(
+        lambda stop: fetch_concurrently(urls, fetch_one, concurrency, per_domain, stop),
+        maxsize=concurrency,
+    )
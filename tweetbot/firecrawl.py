@@ -0,0 +1,268 @@
+"""Firecrawl job manager: batch submission, concurrent polling, streamed pages.
+
+``CrawlJobManager`` submits candidates as batch-scrape jobs, polls them
+concurrently with backoff and yields each page as Firecrawl reports it.
+Point ``FIRECRAWL_API_URL`` at ``tweetbot.fakes`` to run against a local
+stand-in server.
+"""
+import asyncio
+import os
+import time
+from itertools import islice
+
+from tweetbot import content_cache, httpclient, metrics, profiling
+from tweetbot.fetch import fetch_iter, iter_async
+from tweetbot.pages import Page, read_response
+from tweetbot.ratelimit import get_limiter
+from tweetbot.urls import extract_domain, url_fingerprint
+
+FIRECRAWL_API_URL = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev").rstrip("/")
+BATCH_SIZE = int(os.getenv("FIRECRAWL_BATCH_SIZE", "25"))
+JOB_CONCURRENCY = int(os.getenv("FIRECRAWL_JOB_CONCURRENCY", "4"))
+POLL_INTERVAL = float(os.getenv("FIRECRAWL_POLL_INTERVAL", "2"))
+POLL_MAX_INTERVAL = float(os.getenv("FIRECRAWL_POLL_MAX_INTERVAL", "15"))
+JOB_TIMEOUT = float(os.getenv("FIRECRAWL_JOB_TIMEOUT", "300"))
+
+SCRAPE_OPTIONS = {
+    "onlyMainContent": True,
+    "removeBase64Images": True,
+    "blockAds": True,
+    "formats": ["markdown"],
+}
+
+
+def page_status(page):
+    """HTTP status Firecrawl got from the target site for one page, if known."""
+    if isinstance(page, dict) and isinstance(page.get("data"), (dict, Page)):
+        page = page["data"]  # A single /v1/scrape response
+    if isinstance(page, Page):
+        return page.status
+    if not isinstance(page, dict):
+        return None
+    return (page.get("metadata") or {}).get("statusCode", 200 if page.get("markdown") else None)
+
+
+class CrawlJobManager:
+    """Submit Firecrawl batch-scrape jobs and stream their pages."""
+
+    def __init__(self, api_key, base_url=FIRECRAWL_API_URL, batch_size=BATCH_SIZE,
+                 concurrency=JOB_CONCURRENCY, poll_interval=POLL_INTERVAL,
+                 max_poll_interval=POLL_MAX_INTERVAL, timeout=JOB_TIMEOUT):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def submit_batch(self, urls):
+        """Start a batch-scrape job for ``urls`` and return its id."""
+        payload = {"urls": list(urls), **SCRAPE_OPTIONS}
+        r = httpclient.post(f"{self.base_url}/v1/batch/scrape", json=payload, headers=self._headers())
+        print(f"📦 Submitted batch of {len(payload['urls'])} URLs → status: {r.status_code}")
+        r.raise_for_status()
+        return r.json()["id"]
+
+    def scrape(self, url, formats=("markdown",)):
+        """Scrape one page synchronously via ``/v1/scrape``; ``{}`` on failure.
+
+        A markdown-only scrape comes back with its page as a ``Page``.
+        """
+        payload = {"url": url, "formats": list(formats)}
+        try:
+            r = httpclient.post(f"{self.base_url}/v1/scrape", json=payload, headers=self._headers(),
+                                stream=True)
+            print(f"🔍 Scraping {url} → status: {r.status_code}")
+            with r:
+                r.raise_for_status()
+                if list(formats) == ["markdown"]:
+                    return read_response(r)
+                return r.json()
+        except Exception as e:
+            print(f"❌ Scrape error for {url}: {e}")
+            return {}
+
+    def job_status(self, kind, job_id, next_url=None, skip=0):
+        """Status of a job with its pages from ``skip`` on as ``Page`` records (see ``read_response``)."""
+        url = next_url or f"{self.base_url}/v1/{kind}/{job_id}"
+        r = httpclient.get(url, headers=self._headers(), stream=True)
+        with r:
+            r.raise_for_status()
+            return read_response(r, skip)
+
+    async def _poll(self, kind, job_id):
+        """Yield pages of one job as they complete, backing off while idle."""
+        seen = 0
+        interval = self.poll_interval
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # Pages already yielded are skipped by the parser, never decoded.
+            status = await asyncio.to_thread(self.job_status, kind, job_id, None, seen)
+            for page in status.get("data") or []:
+                yield page
+            progressed = status["count"] > seen
+            seen = max(seen, status["count"])
+
+            state = status.get("status")
+            if state in ("completed", "failed", "cancelled"):
+                metrics.count("credits_total", status.get("creditsUsed") or 0, api="firecrawl")
+            if state == "completed":
+                # Large results are paginated through "next" links.
+                next_url = status.get("next")
+                while next_url:
+                    more = await asyncio.to_thread(self.job_status, kind, job_id, next_url)
+                    for page in more.get("data") or []:
+                        yield page
+                    next_url = more.get("next")
+                return
+            if state in ("failed", "cancelled"):
+                print(f"❌ Firecrawl {kind} job {job_id} {state}")
+                return
+            if time.monotonic() > deadline:
+                print(f"⏱ Firecrawl {kind} job {job_id} timed out after {self.timeout:.0f}s")
+                return
+
+            interval = self.poll_interval if progressed else min(interval * 1.5, self.max_poll_interval)
+            await asyncio.sleep(interval)
+
+    async def _stream(self, urls, stop):
+        """Submit ``urls`` in batches and yield ``(source, page or None)``.
+
+        Every submitted URL is yielded exactly once; ``None`` means Firecrawl
+        finished without returning a page for it.
+        """
+        urls = iter(urls)
+        pages = asyncio.Queue()
+        running = set()
+
+        async def run_job(batch):
+            by_fp = {url_fingerprint(url): url for url in batch}
+            started = time.perf_counter()
+            try:
+                job_id = await asyncio.to_thread(self.submit_batch, batch)
+                async for page in self._poll("batch/scrape", job_id):
+                    reported = page.source if isinstance(page, Page) else ""
+                    source = by_fp.pop(url_fingerprint(reported), None)
+                    if source:
+                        await pages.put((source, page))
+            except Exception as e:
+                print(f"❌ Firecrawl batch error: {e}")
+            metrics.span("crawl", time.perf_counter() - started)
+            metrics.count("pages_total", len(batch) - len(by_fp), source="firecrawl", result="ok")
+            metrics.count("pages_total", len(by_fp), source="firecrawl", result="missing")
+            for source in by_fp.values():
+                await pages.put((source, None))
+
+        exhausted = False
+
+        def top_up():
+            nonlocal exhausted
+            while not exhausted and not stop.is_set() and len(running) < self.concurrency:
+                batch = list(islice(urls, self.batch_size))
+                if not batch:
+                    exhausted = True
+                    return
+                task = asyncio.ensure_future(run_job(batch))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+        try:
+            while True:
+                top_up()
+                if not running and pages.empty() and (exhausted or stop.is_set()):
+                    return
+                try:
+                    item = await asyncio.wait_for(pages.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                yield item
+        finally:
+            for task in running:
+                task.cancel()
+
+    def scrape_many(self, urls):
+        """Synchronously iterate ``(source, page or None)`` for ``urls``."""
+        return iter_async(lambda stop: self._stream(urls, stop), maxsize=self.batch_size)
+
+
+def fetch_pages(urls, manager, fallback=None, chunk_size=None):
+    """Yield ``(source, {"data": [compact pages]})`` for each URL.
+
+    URLs are pulled from ``urls`` a chunk at a time; ``chunk_size`` may be a
+    callable so a capped run only asks for as many pages as it still needs.
+    Cached pages are served first; the rest go to Firecrawl as batch jobs.
+    URLs a job returned nothing for are retried through ``fallback`` (a
+    single-URL scrape) concurrently; anything still empty yields ``{}``.
+    Target sites are paced by the shared limiter (one token per URL) and
+    the status Firecrawl saw for each page is reported back, so domains
+    whose breaker is open are not sent to Firecrawl at all.  A URL that
+    comes back without a page status (a Firecrawl or API error) is not
+    held against its site.
+    """
+    limiter = get_limiter()
+    urls = iter(urls)
+    while True:
+        size = chunk_size() if callable(chunk_size) else chunk_size
+        chunk = list(islice(urls, size or manager.batch_size * manager.concurrency))
+        if not chunk:
+            return
+        misses = []
+        for source in chunk:
+            entries = content_cache.lookup(source)
+            if entries:
+                yield source, {"data": entries}
+            elif not limiter.acquire(extract_domain(source)):
+                print(f"⛔ Skipping {source}: {extract_domain(source)} is cooling off")
+                yield source, {}
+            else:
+                misses.append(source)
+
+        def settle(source, page):
+            status = page_status(page)
+            if status is None:
+                limiter.release(extract_domain(source))
+            else:
+                limiter.record(extract_domain(source), status)
+
+        failed = []
+        for source, page in manager.scrape_many(misses):
+            entries = content_cache.compact_entries({"data": page}, source) if page else []
+            if entries or page_status(page) is not None:
+                settle(source, page)
+            if entries:
+                content_cache.store(source, entries)
+                yield source, {"data": entries}
+            else:
+                failed.append(source)
+        profiling.checkpoint("crawl")
+        limiter.save()  # One write for the breaker changes of the whole chunk
+
+        if fallback and failed:
+            print(f"⚠ {len(failed)} URLs missing from batch results, falling back to scrape...")
+
+            def scrape_one(source):
+                # Its token was taken before the batch; the batch did not use it.
+                with metrics.stage("scrape"):
+                    data = fallback(source)
+                if data:
+                    metrics.count("credits_total", api="firecrawl")
+                settle(source, data)
+                entries = content_cache.compact_entries(data, source)
+                content_cache.store(source, entries)
+                return {"data": entries} if entries else {}
+
+            for source, data in fetch_iter(failed, scrape_one):
+                yield source, data
+            profiling.checkpoint("scrape")
+            limiter.save()
+        else:
+            for source in failed:
+                settle(source, None)
+                yield source, {}
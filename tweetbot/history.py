@@ -0,0 +1,186 @@
+"""Indexed tweet history shared by every entry point.
+
+URLs are kept in SQLite keyed by their canonical fingerprint (see
+``tweetbot.urls``), with the ID of the tweet they went out as; the legacy
+``tweet_history.json`` is imported the first time the database is opened.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from tweetbot.urls import url_fingerprint
+
+HISTORY_FILE = "tweet_history.json"
+HISTORY_DB = os.getenv("HISTORY_DB", "tweet_history.db")
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    added_at REAL  -- NULL for URLs imported without a posting time
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_added_at ON history (added_at);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class HistoryStore:
+    """URL history with O(1) lookups and append-only writes."""
+
+    def __init__(self, path=HISTORY_DB, legacy_file=HISTORY_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        if legacy_file:
+            self._import_legacy(legacy_file)
+
+    def _migrate(self):
+        # Overlapping runs may open an old file together; upgrade one at a time.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(history)")}
+            if version < 2 and "tweet_id" not in columns:
+                self.conn.execute("ALTER TABLE history ADD COLUMN tweet_id TEXT")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def _import_legacy(self, legacy_file):
+        if self._get_meta("legacy_imported") or not os.path.exists(legacy_file):
+            return
+        with open(legacy_file, "r") as f:
+            urls = json.load(f)
+        with self.conn:
+            # The JSON list never recorded when a URL was posted.
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO history (key, url, added_at) VALUES (?, ?, NULL)",
+                ((url_fingerprint(url), url) for url in urls if url),
+            )
+            self._set_meta("legacy_imported", legacy_file)
+        print(f"📥 Imported {len(urls)} URLs from {legacy_file} into {self.path}")
+
+    def _get_meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value)
+        )
+
+    def __contains__(self, url):
+        row = self.conn.execute(
+            "SELECT 1 FROM history WHERE key = ?", (url_fingerprint(url),)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def __iter__(self):
+        for (url,) in self.conn.execute("SELECT url FROM history ORDER BY added_at"):
+            yield url
+
+    def recent(self, since):
+        """``(url, added_at)`` for every URL recorded after ``since``.
+
+        URLs imported from the legacy file have no time and are left out.
+        """
+        return self.conn.execute(
+            "SELECT url, added_at FROM history WHERE added_at IS NOT NULL AND added_at > ?", (since,)
+        ).fetchall()
+
+    def append(self, url, canonical=None, tweet_id=None):
+        """Record a URL (and its canonical link, if known); no-op if already seen.
+
+        ``tweet_id`` is stored against the URL even if it was already recorded.
+        """
+        now = time.time()
+        keys = {url_fingerprint(url), url_fingerprint(url, canonical)}
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO history (key, url, added_at) VALUES (?, ?, ?)",
+            ((key, url, now) for key in keys),
+        )
+        if tweet_id:
+            self.conn.executemany(
+                "UPDATE history SET tweet_id = ? WHERE key = ?", ((tweet_id, key) for key in keys)
+            )
+
+    def tweet_id(self, url):
+        """ID of the tweet ``url`` was posted as, if known."""
+        row = self.conn.execute(
+            "SELECT tweet_id FROM history WHERE key = ?", (url_fingerprint(url),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def commit(self):
+        self.conn.commit()
+
+    def expire(self, max_age_days):
+        """Forget URLs older than ``max_age_days`` so they may be posted again.
+
+        Near-duplicate signatures (``tweetbot.neardup``) kept in the same
+        database expire with them, or the page would still be blocked.
+        URLs imported from the legacy file, whose age is unknown, are kept.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM history WHERE added_at < ?", (cutoff,))
+            has_signatures = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'signatures'"
+            ).fetchone()
+            if has_signatures:
+                self.conn.execute(
+                    "DELETE FROM signature_bands WHERE url IN "
+                    "(SELECT url FROM signatures WHERE added_at < ?)",
+                    (cutoff,),
+                )
+                self.conn.execute("DELETE FROM signatures WHERE added_at < ?", (cutoff,))
+        return cur.rowcount
+
+    def compact(self):
+        """Fold the write-ahead log back in and reclaim free pages."""
+        self.conn.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conn.execute("VACUUM")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def load_history(path=HISTORY_DB):
+    return HistoryStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the tweet history store.")
+    parser.add_argument("command", choices=["stats", "compact", "expire"])
+    parser.add_argument("--days", type=int, default=180, help="Age limit for expire")
+    parser.add_argument("--db", default=HISTORY_DB)
+    args = parser.parse_args()
+
+    history = load_history(args.db)
+    if args.command == "expire":
+        print(f"🧹 Expired {history.expire(args.days)} URLs older than {args.days} days")
+    elif args.command == "compact":
+        history.compact()
+        print(f"🗜 Compacted {args.db}")
+    print(f"📚 {len(history)} URLs in history")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Shared pooled HTTP client for Firecrawl, SerpAPI and X calls.
+
+Every request goes through one ``requests.Session`` so connections (and
+their TLS handshakes) are reused per host, every call has a connect/read
+timeout so a hung server cannot stall a run, and transient failures
+(connection errors, 429 and 5xx) are retried with jittered exponential
+backoff that honours ``Retry-After``.  Each attempt also goes through the
+shared per-domain limiter, so a host that is throttling us is paced down
+and, if it keeps failing, skipped until its circuit breaker cools off.
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tweetbot import metrics
+from tweetbot.ratelimit import CircuitOpen, get_limiter, parse_retry_after
+from tweetbot.urls import extract_domain
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", "120"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def retry_after_seconds(response):
+    """Seconds the server asked us to wait, or None if it did not say."""
+    return parse_retry_after(response.headers.get("Retry-After"))
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given zero-based attempt."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def request(method, url, retries=MAX_RETRIES, timeout=None, **kwargs):
+    """Send a request, retrying transient failures.
+
+    Pass ``retries=0`` for calls that must never be repeated blindly, such
+    as posting a tweet.  Raises ``CircuitOpen`` without sending anything
+    if the host's breaker is open.
+    """
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    host = urlsplit(url).netloc
+    domain = extract_domain(url)
+    limiter = get_limiter()
+    session = get_session()
+    for attempt in range(retries + 1):
+        if not limiter.acquire(domain):
+            raise CircuitOpen(f"{domain} is parked by its circuit breaker")
+        started = time.perf_counter()
+        try:
+            r = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            _record(method, host, "error", started)
+            limiter.record(domain, None)
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"🔁 {method} {host} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+        else:
+            _record(method, host, r.status_code, started)
+            delay = retry_after_seconds(r)
+            limiter.record(domain, r.status_code, delay)
+            if r.status_code not in RETRY_STATUSES or attempt == retries:
+                return r
+            if delay is None:
+                delay = backoff_delay(attempt)
+            elif delay > RETRY_AFTER_MAX:
+                return r
+            print(f"🔁 {method} {host} → {r.status_code}, retrying in {delay:.1f}s")
+            r.close()
+        time.sleep(delay)
+
+
+def _record(method, host, status, started):
+    if not metrics.ENABLED:
+        return
+    seconds = time.perf_counter() - started
+    metrics.count("http_requests_total", host=host, status=status)
+    metrics.observe("http_request_seconds", seconds, host=host)
+    metrics.event("http", method=method, host=host, status=status, seconds=round(seconds, 6))
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
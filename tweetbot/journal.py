@@ -0,0 +1,147 @@
+"""Per-run checkpoints so a restarted job picks up where it stopped.
+
+With a run ID the engine records each stage's output in
+``JOURNAL_DIR/<run id>.db``, and a run started again with the same ID
+replays it instead of repeating the calls.  Journals of finished runs
+start afresh; ones untouched for ``JOURNAL_MAX_AGE_DAYS`` are deleted.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import time
+
+RUN_ID = os.getenv("RUN_ID") or os.getenv("GITHUB_RUN_ID")
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "journals")
+JOURNAL_MAX_AGE_DAYS = float(os.getenv("JOURNAL_MAX_AGE_DAYS", "3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    stage TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (stage, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def run_id(scope):
+    """Journal ID for ``scope`` (a script or campaign) in this CI run, or None outside CI."""
+    if not RUN_ID:
+        return None
+    return f"{scope}-{RUN_ID}"
+
+
+def journal_path(run, directory=JOURNAL_DIR):
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", run) + ".db")
+
+
+def cleanup(directory=JOURNAL_DIR, max_age_days=JOURNAL_MAX_AGE_DAYS, keep=()):
+    """Delete journals not written to for ``max_age_days``; returns how many went."""
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        if path in keep:
+            continue
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        except OSError:
+            continue
+        removed += 1
+    return removed
+
+
+class Journal:
+    """Checkpoints of one run, keyed by stage and item."""
+
+    def __init__(self, run, directory=JOURNAL_DIR, max_age_days=JOURNAL_MAX_AGE_DAYS):
+        os.makedirs(directory, exist_ok=True)
+        self.run = run
+        self.path = journal_path(run, directory)
+        removed = cleanup(directory, max_age_days, keep=(self.path,))
+        if removed:
+            print(f"🧹 Removed {removed} journals older than {max_age_days:g} days")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if self._get_meta("completed"):
+            # That run finished; a new one under its ID starts afresh.
+            with self.conn:
+                self.conn.execute("DELETE FROM entries")
+                self.conn.execute("DELETE FROM meta")
+        self.resumed = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] > 0
+
+    def _get_meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, stage, key, default=None):
+        row = self.conn.execute(
+            "SELECT value FROM entries WHERE stage = ? AND key = ?", (stage, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def load(self, stage):
+        """Every checkpoint of ``stage`` as ``{key: value}``, oldest first."""
+        rows = self.conn.execute(
+            "SELECT key, value FROM entries WHERE stage = ? ORDER BY rowid", (stage,)
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, stage, key, value):
+        """Record one completed item; it is durable once this returns."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (stage, key, value, added_at) VALUES (?, ?, ?, ?)",
+                (stage, key, json.dumps(value, default=str), time.time()),
+            )
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT stage, COUNT(*) FROM entries GROUP BY stage"))
+
+    def complete(self):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('completed', ?)",
+                              (str(time.time()),))
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or clean up run journals.")
+    parser.add_argument("command", nargs="?", default="list", choices=["list", "clean"])
+    parser.add_argument("--dir", default=JOURNAL_DIR)
+    parser.add_argument("--days", type=float, default=JOURNAL_MAX_AGE_DAYS, help="Age limit for clean")
+    args = parser.parse_args()
+
+    if args.command == "clean":
+        print(f"🧹 Removed {cleanup(args.dir, args.days)} journals older than {args.days:g} days")
+    for path in sorted(glob.glob(os.path.join(args.dir, "*.db"))):
+        conn = sqlite3.connect(path)
+        try:
+            counts = dict(conn.execute("SELECT stage, COUNT(*) FROM entries GROUP BY stage"))
+            completed = conn.execute("SELECT value FROM meta WHERE name = 'completed'").fetchone()
+        except sqlite3.Error:
+            counts, completed = {}, None
+        finally:
+            conn.close()
+        age = (time.time() - os.path.getmtime(path)) / 3600
+        state = "complete" if completed else "unfinished"
+        print(f"📓 {os.path.basename(path)[:-3]}: {state}, {age:.1f}h old, {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Per-stage timings, counters and JSON-lines events for a run.
+
+The pipeline stages (search, crawl, scrape, compose, post) and the HTTP
+client report here: latencies go into histograms, and status codes, cache
+lookups and API credits into counters.  With ``METRICS_FILE`` set every
+stage span and HTTP call is also written there as one JSON event per
+line, followed by a summary event at the end of the run.
+``METRICS_OPENMETRICS`` names a file for the final values in OpenMetrics
+text format, and ``METRICS=1`` just prints the summary.
+
+When none of these are set, metrics are off.  ``stage()`` then returns a
+shared no-op context manager and every other call returns on its first
+line, so instrumented code costs next to nothing.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_OPENMETRICS = os.getenv("METRICS_OPENMETRICS")
+ENABLED = bool(os.getenv("METRICS") or METRICS_FILE or METRICS_OPENMETRICS)
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bucket bound containing the ``q`` quantile."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        self.registry.observe("stage_seconds", seconds, stage=self.name, **self.labels)
+        self.registry.event("stage", stage=self.name, seconds=round(seconds, 6),
+                            error=exc_type.__name__ if exc_type else None, **self.labels)
+        return False
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Registry:
+    """Counters, gauges and histograms keyed by name and labels."""
+
+    def __init__(self, events_path=None):
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self.histograms = defaultdict(Histogram)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._events = open(events_path, "a", encoding="utf-8") if events_path else None
+
+    def count(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[_key(name, labels)] += value
+
+    def gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        with self._lock:
+            self.histograms[_key(name, labels)].observe(seconds)
+
+    def event(self, kind, **fields):
+        if self._events is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 6), "event": kind, **fields}, default=str)
+        with self._lock:
+            self._events.write(line + "\n")
+
+    def summary(self):
+        """Aggregated view of the run, as a JSON-friendly dict."""
+        with self._lock:
+            return {
+                "duration_s": round(time.time() - self.started, 3),
+                "stages": {
+                    dict(labels).get("stage", name): {
+                        "count": h.count,
+                        "total_s": round(h.sum, 4),
+                        "mean_s": round(h.sum / h.count, 4) if h.count else 0.0,
+                        "p95_s": round(h.quantile(0.95), 4),
+                        "max_s": round(h.max, 4),
+                    }
+                    for (name, labels), h in self.histograms.items() if name == "stage_seconds"
+                },
+                "counters": {_flat(name, labels): value for (name, labels), value in sorted(self.counters.items())},
+                "gauges": {_flat(name, labels): value for (name, labels), value in sorted(self.gauges.items())},
+            }
+
+    def openmetrics(self):
+        """Current values in OpenMetrics text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, items in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({name for name, _ in items}):
+                    metric = name[:-len("_total")] if kind == "counter" and name.endswith("_total") else name
+                    lines.append(f"# TYPE tweetbot_{metric} {kind}")
+                    for (n, labels), value in sorted(items.items()):
+                        if n == name:
+                            suffix = "_total" if kind == "counter" else ""
+                            lines.append(f"tweetbot_{metric}{suffix}{_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE tweetbot_{name} histogram")
+                for (hname, labels), h in sorted(self.histograms.items()):
+                    if hname != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+                        cumulative += n
+                        lines.append(f"tweetbot_{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"tweetbot_{name}_count{_labels(labels)} {h.count}")
+                    lines.append(f"tweetbot_{name}_sum{_labels(labels)} {h.sum}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+
+def _flat(name, labels):
+    return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = Registry(METRICS_FILE)
+    return _registry
+
+
+def stage(name, **labels):
+    """Context manager timing one unit of work in pipeline stage ``name``."""
+    if not ENABLED:
+        return _NULL_STAGE
+    return _Stage(get_registry(), name, labels)
+
+
+def span(name, seconds, **labels):
+    """Record a stage duration measured by the caller (e.g. across awaits)."""
+    if ENABLED:
+        registry = get_registry()
+        registry.observe("stage_seconds", seconds, stage=name, **labels)
+        registry.event("stage", stage=name, seconds=round(seconds, 6), **labels)
+
+
+def count(name, value=1, **labels):
+    if ENABLED:
+        get_registry().count(name, value, **labels)
+
+
+def gauge(name, value, **labels):
+    if ENABLED:
+        get_registry().gauge(name, value, **labels)
+
+
+def observe(name, seconds, **labels):
+    if ENABLED:
+        get_registry().observe(name, seconds, **labels)
+
+
+def event(kind, **fields):
+    if ENABLED:
+        get_registry().event(kind, **fields)
+
+
+def cache_stats(name, stats):
+    """Record a ``DiskCache.stats()`` snapshot for cache ``name``."""
+    if not ENABLED:
+        return
+    for result in ("hits", "stale_hits", "misses"):
+        count("cache_lookups_total", stats.get(result, 0), cache=name, result=result)
+    gauge("cache_hit_ratio", stats["hit_rate"], cache=name)
+
+
+def finish():
+    """Print the run summary and write the summary event / OpenMetrics file."""
+    if not ENABLED or _registry is None:
+        return
+    summary = _registry.summary()
+    print(f"📊 Run metrics ({summary['duration_s']}s):")
+    for name, s in sorted(summary["stages"].items(), key=lambda item: -item[1]["total_s"]):
+        print(f"   {name:<8} {s['count']:>5} calls  {s['total_s']:>8.3f}s total  "
+              f"{s['mean_s']:.3f}s mean  {s['p95_s']:.3f}s p95")
+    for name, value in summary["counters"].items():
+        print(f"   {name} = {value:g}")
+    for name, value in summary["gauges"].items():
+        print(f"   {name} = {value:.3g}")
+    _registry.event("summary", **summary)
+    if METRICS_OPENMETRICS:
+        with open(METRICS_OPENMETRICS, "w") as f:
+            f.write(_registry.openmetrics())
+    _registry.close()
@@ -0,0 +1,131 @@
+"""Near-duplicate page detection with MinHash signatures and LSH banding.
+
+Syndicated copies of one article (medium.com, towardsdatascience.com, the
+author's blog) have different URLs, so URL history lets them all through.
+Each posted page's markdown gets a compact MinHash signature, stored next
+to the history table.  Signatures are split into bands whose hashes are
+indexed, so a lookup only compares against pages that share at least one
+band, instead of scanning every stored signature, and stays fast with
+hundreds of thousands of entries.
+"""
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import time
+
+from tweetbot.history import HISTORY_DB
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+MIN_SHINGLES = int(os.getenv("NEARDUP_MIN_SHINGLES", "20"))
+# Estimated Jaccard similarity above which two pages count as the same article.
+THRESHOLD = float(os.getenv("NEARDUP_THRESHOLD", "0.6"))
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(0x5EED)  # Fixed seed: signatures must be stable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_WORDS = re.compile(r"\w+", re.UNICODE)
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    url TEXT PRIMARY KEY,
+    minhash BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_added_at ON signatures (added_at);
+CREATE TABLE IF NOT EXISTS signature_bands (
+    key INTEGER NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signature_bands_key ON signature_bands (key);
+CREATE INDEX IF NOT EXISTS signature_bands_url ON signature_bands (url);
+"""
+
+
+def _shingles(text):
+    words = _WORDS.findall(text.lower())
+    return {
+        int.from_bytes(
+            hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"), digest_size=4).digest(),
+            "big",
+        )
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text):
+    """MinHash signature of ``text``, or None if it is too short to judge."""
+    shingles = _shingles(text)
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    return [min(((a * s + b) % _PRIME) & _MAX_HASH for s in shingles) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<I{ROWS}I", band, *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index; lives in the history database by default."""
+
+    def __init__(self, path=HISTORY_DB, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def find(self, content, signature=None):
+        """Return the URL of a stored near-duplicate of ``content``, if any."""
+        signature = signature or minhash(content)
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+        candidates = self.conn.execute(
+            "SELECT s.url, s.minhash FROM signatures s WHERE s.url IN "
+            f"(SELECT url FROM signature_bands WHERE key IN ({', '.join('?' * len(keys))}))",
+            keys,
+        )
+        best_url, best = None, self.threshold
+        for url, blob in candidates:
+            score = similarity(signature, _PACK.unpack(blob))
+            if score >= best:
+                best_url, best = url, score
+        return best_url
+
+    def add(self, url, content, signature=None):
+        signature = signature or minhash(content)
+        if signature is None:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM signature_bands WHERE url = ?", (url,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO signatures (url, minhash, added_at) VALUES (?, ?, ?)",
+                (url, _PACK.pack(*signature), time.time()),
+            )
+            self.conn.executemany(
+                "INSERT INTO signature_bands (key, url) VALUES (?, ?)",
+                ((key, url) for key in band_keys(signature)),
+            )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,221 @@
+"""Compact page records and a streaming reader for Firecrawl responses.
+
+``read_response`` parses a response as it arrives into one ``Page`` per
+``data`` entry (URLs, title, status and up to ``EXCERPT_CHARS`` of
+content); ``python -m tweetbot.pages`` measures its memory use.
+"""
+import argparse
+import codecs
+import json
+import os
+import re
+import time
+import tracemalloc
+
+EXCERPT_CHARS = int(os.getenv("CONTENT_EXCERPT_CHARS", "2000"))
+CHUNK_SIZE = 64 * 1024
+
+# Punctuation, the opening quote of a string or a bare literal (number, true, null, ...)
+_TOKEN = re.compile(r'\s*(?:([{}\[\],:"])|([^\s{}\[\],:"]+))')
+_OPEN = ("{", "[")
+_CLOSE = ("}", "]")
+
+
+def page_canonical(metadata):
+    """The page's rel=canonical (or og:url) as Firecrawl reports it, if any."""
+    return metadata.get("canonical") or metadata.get("ogUrl") or None
+
+
+class Page:
+    """The parts of one Firecrawl page the bot reads."""
+
+    __slots__ = ("source", "url", "canonical", "title", "content", "status")
+
+    def __init__(self, source, url, title, content, status, canonical=None):
+        self.source = source
+        self.url = url
+        self.canonical = canonical
+        self.title = title
+        self.content = content
+        self.status = status
+
+    @classmethod
+    def from_entry(cls, entry, excerpt=EXCERPT_CHARS):
+        metadata = entry.get("metadata") or {}
+        content = entry.get("content") or entry.get("markdown") or ""
+        source = metadata.get("sourceURL") or metadata.get("url") or ""
+        return cls(
+            source=source or entry.get("url") or "",
+            url=entry.get("url") or source,
+            title=entry.get("title") or metadata.get("title") or "",
+            content=content[:excerpt],
+            status=metadata.get("statusCode", 200 if content else None),
+            canonical=page_canonical(metadata),
+        )
+
+    def __repr__(self):
+        return f"Page({self.url!r}, {self.title!r}, status={self.status})"
+
+
+def _string_end(buf, start):
+    """Index just past the string opened at ``start``, or -1 if it is not all in ``buf``."""
+    end = buf.find('"', start + 1)
+    while end != -1:
+        backslashes = end - 1
+        while buf[backslashes] == "\\":
+            backslashes -= 1
+        if (end - 1 - backslashes) % 2 == 0:
+            return end + 1
+        end = buf.find('"', end + 1)
+    return -1
+
+
+def _tokens(chunks):
+    """JSON tokens from an iterable of UTF-8 byte chunks, reading only as needed."""
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    chunks = iter(chunks)
+    buf, pos, eof = "", 0, False
+    while True:
+        match = _TOKEN.match(buf, pos)
+        end = match and match.end()
+        if end and match.group(1) == '"':
+            # Strings are found with str.find, which is much faster than a regex on long markdown.
+            end = _string_end(buf, end - 1)
+        # A token touching the end of the buffer may continue in the next chunk.
+        if not end or end < 0 or (end == len(buf) and not eof):
+            if eof:
+                if buf[pos:].strip():
+                    raise ValueError(f"Malformed or truncated JSON near {buf[pos:pos + 40]!r}")
+                return
+            chunk = next(chunks, None)
+            if chunk is None:
+                buf, pos, eof = buf[pos:] + decode(b"", final=True), 0, True
+            else:
+                buf, pos = buf[pos:] + decode(chunk), 0
+            continue
+        yield buf[match.start(match.lastindex):end]
+        pos = end
+
+
+def _value(tokens, first, keep=True):
+    """Raw JSON text of the value that starts with token ``first`` (None if not ``keep``)."""
+    if first not in _OPEN:
+        return first
+    parts = [first] if keep else None
+    depth = 1
+    for token in tokens:
+        if keep:
+            parts.append(token)
+        if token in _OPEN:
+            depth += 1
+        elif token in _CLOSE:
+            depth -= 1
+            if not depth:
+                return "".join(parts) if keep else None
+    raise ValueError("Truncated JSON")
+
+
+def _entry(raw, excerpt):
+    entry = json.loads(raw)
+    return Page.from_entry(entry, excerpt) if isinstance(entry, dict) else entry
+
+
+def parse_stream(chunks, skip=0, key="data", excerpt=EXCERPT_CHARS):
+    """Parse a JSON object from byte ``chunks`` without holding all of it.
+
+    Returns its top-level fields, with ``key`` as a ``Page`` if it holds
+    an object, or a list of ``Page`` records for array entries ``skip``
+    onwards.  ``count`` is the number of entries ``key`` held.
+    """
+    tokens = _tokens(chunks)
+    if next(tokens, None) != "{":
+        raise ValueError("Expected a JSON object")
+    fields = {}
+    count = 0
+    for token in tokens:
+        if token == "}":
+            break
+        if token == ",":
+            continue
+        name = json.loads(token)
+        if next(tokens, None) != ":":
+            raise ValueError(f"Expected ':' after {name!r}")
+        first = next(tokens, None)
+        if first is None:
+            raise ValueError(f"Truncated JSON after {name!r}")
+        if name != key or first not in _OPEN:
+            fields[name] = json.loads(_value(tokens, first))
+        elif first == "{":
+            fields[name] = _entry(_value(tokens, first), excerpt)
+            count = 1
+        else:
+            pages = []
+            for token in tokens:
+                if token == "]":
+                    break
+                if token == ",":
+                    continue
+                if count < skip:
+                    _value(tokens, token, keep=False)
+                else:
+                    pages.append(_entry(_value(tokens, token), excerpt))
+                count += 1
+            else:
+                raise ValueError(f"Truncated JSON in {name!r}")
+            fields[name] = pages
+    else:
+        raise ValueError("Truncated JSON object")
+    fields["count"] = count
+    return fields
+
+
+def read_response(response, skip=0, key="data", excerpt=EXCERPT_CHARS):
+    """``parse_stream`` over a ``requests`` response sent with ``stream=True``; closes it."""
+    with response:
+        return parse_stream(response.iter_content(CHUNK_SIZE), skip, key, excerpt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of r.json() and streamed parsing on a synthetic crawl.")
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=8000, help="Characters of markdown per page")
+    args = parser.parse_args()
+
+    markdown = ("Agentic AI course notes and prompting tips. " * (args.page_size // 44 + 1))[:args.page_size]
+
+    def pages():
+        for i in range(args.pages):
+            yield {"markdown": markdown, "metadata": {
+                "title": f"Article {i}", "sourceURL": f"https://example.com/post/{i}",
+                "statusCode": 200, "description": "A synthetic page", "language": "en"}}
+
+    # A completed batch-scrape status, cut into the chunks a socket would deliver.
+    body = json.dumps({"success": True, "status": "completed", "creditsUsed": args.pages,
+                       "data": list(pages())}).encode()
+    chunks = [body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+    print(f"📄 {args.pages} pages, {len(body) / 1024 / 1024:.1f} MiB of JSON")
+    del body
+
+    def whole():
+        # What r.json() did: the full body, then every entry decoded.
+        data = json.loads(b"".join(chunks))
+        return [Page.from_entry(entry) for entry in data["data"]]
+
+    def streamed():
+        return parse_stream(chunks)["data"]
+
+    for label, parse in (("r.json()", whole), ("streamed", streamed)):
+        started = time.perf_counter()
+        parse()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        kept = parse()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"🧮 {label}: {len(kept)} pages in {elapsed:.2f}s, "
+              f"peak {peak / 1024 / 1024:.1f} MiB, kept {current / 1024 / 1024:.1f} MiB")
+        del kept
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Lazy run pipeline: search → filter → fetch → compose → emit.
+
+Every stage is a generator that pulls from the stage before it only when
+its own consumer asks for the next item.  ``emit`` stops pulling as soon
+as the daily cap is reached, so no further SerpAPI queries run and no
+further pages are fetched: we pay for the pages we post, not for the
+whole candidate set.  ``Budget`` lets the fetch stage size its batches to
+the posts still wanted.  ``fan_out`` lets a stage run several of its
+calls at once (search queries, result pages) without giving up either
+the laziness or a deterministic order.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from tweetbot import metrics, profiling
+from tweetbot.urls import url_fingerprint
+
+
+class Budget:
+    """How many more tweets this run may emit (``cap=None`` means no limit)."""
+
+    def __init__(self, cap=None):
+        self.cap = cap
+        self.used = 0
+
+    @property
+    def remaining(self):
+        return None if self.cap is None else max(0, self.cap - self.used)
+
+    @property
+    def exhausted(self):
+        return self.cap is not None and self.used >= self.cap
+
+
+def search(queries, search_one, concurrency=1):
+    """Yield ``(query, results)`` for each query, in query order.
+
+    ``search_one(query)`` runs on up to ``concurrency`` worker threads (see
+    ``fan_out``); a query that fails is reported and skipped.
+    """
+    def timed(query):
+        with metrics.stage("search"):
+            return search_one(query)
+
+    for query, results, error in fan_out(queries, timed, concurrency):
+        profiling.checkpoint("search")
+        if error is not None:
+            print(f"❌ Search error for '{query}': {error}")
+            continue
+        yield query, results
+
+
+def fan_out(items, call, concurrency=1):
+    """Yield ``(item, result, error)`` for each item, in input order.
+
+    Up to ``concurrency`` calls run at once in worker threads, but the
+    look-ahead starts at one and doubles each time the consumer comes back
+    for more, so a consumer that stops after the first result wastes at
+    most one call.  ``items`` is only advanced on this thread.
+    """
+    items = iter(items)
+    if concurrency <= 1:
+        for item in items:
+            try:
+                yield item, call(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    ahead = 1
+    try:
+        while True:
+            for item in islice(items, ahead - len(pending)):
+                pending.append((item, pool.submit(call, item)))
+            if not pending:
+                return
+            item, future = pending.popleft()
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+            ahead = min(concurrency, ahead * 2)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def unseen(urls, history):
+    """Drop URLs already posted or already yielded this run."""
+    seen = set()
+    for url in urls:
+        fp = url_fingerprint(url)
+        if fp in seen:
+            continue
+        seen.add(fp)
+        if url in history:
+            print(f"⏭ Skipping duplicate from history: {url}")
+            continue
+        yield url
+
+
+def compose(results, make_tweet, history=None, near_dups=None):
+    """Turn fetched ``(source, data)`` pairs into at most one tweet per source.
+
+    Pages that are near-duplicates of something already posted are recorded
+    in history (so they are not fetched again) and skipped.
+    """
+    for source, data in results:
+        entries = data.get("data") if data else None
+        if not entries:
+            print(f"⚠ No usable data for {source}")
+            continue
+        for entry in entries:
+            page_url = entry.get("url") or source
+            content = entry.get("content", "")
+            with metrics.stage("compose"):
+                duplicate_of = near_dups.find(content) if near_dups is not None else None
+                if duplicate_of:
+                    print(f"♻ Skipping near-duplicate of {duplicate_of}: {page_url}")
+                    metrics.count("near_duplicates_total")
+                    if history is not None:
+                        history.append(page_url, canonical=entry.get("canonical"))
+                        history.commit()
+                    continue
+
+                tweet_text = make_tweet(entry.get("title") or "Untitled", page_url)
+                if len(tweet_text) > 280:
+                    tweet_text = tweet_text[:277] + "..."
+            profiling.checkpoint("compose")
+            yield {
+                "text": tweet_text,
+                "url": page_url,
+                "source": source,
+                "canonical": entry.get("canonical"),
+                "content": content,
+            }
+            break
+
+
+def emit(tweets, publish, budget, history=None, near_dups=None):
+    """Publish tweets until the budget is spent, then close the pipeline.
+
+    ``publish(tweet)`` returns True when the tweet went out (or was
+    queued); only then is it recorded and counted against the cap.
+    """
+    try:
+        for tweet in tweets:
+            with metrics.stage("post"):
+                published = publish(tweet)
+            metrics.count("tweets_total", result="published" if published else "failed")
+            profiling.checkpoint("post")
+            if not published:
+                continue
+            if history is not None:
+                history.append(tweet["url"], canonical=tweet.get("canonical"))
+                history.append(tweet["source"])
+                history.commit()
+            if near_dups is not None:
+                near_dups.add(tweet["url"], tweet["content"])
+            budget.used += 1
+            if budget.exhausted:
+                print(f"⏹ Reached daily tweet cap of {budget.cap}")
+                break
+    finally:
+        tweets.close()
+    return budget.used
@@ -0,0 +1,159 @@
+"""``--profile DIR`` support for the entry points.
+
+A profiling session writes three artifacts to ``DIR``:
+
+* ``cprofile.pstats`` (plus a ``cprofile.txt`` summary sorted by cumulative
+  time) from ``cProfile``, covering the main thread;
+* ``tracemalloc.txt``, the top allocation sites and growth since start-up,
+  snapshotted when the pipeline crosses a stage boundary
+  (``checkpoint()``) and at the end of the run.  Snapshots are only
+  analysed once the run is over, so taking them stays cheap;
+* ``stacks.collapsed``, samples of every thread's stack (including the
+  fetch loops and the Scrapy reactor) in the collapsed format that
+  ``flamegraph.pl`` and speedscope read.
+
+Outside a session ``checkpoint()`` returns immediately.
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))
+TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "1"))
+TOP_ALLOCATIONS = 15
+SNAPSHOTS_PER_STAGE = 3
+
+_session = None
+
+
+class StackSampler(threading.Thread):
+    """Background thread that counts collapsed stacks of all other threads."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=5)
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    def __init__(self, directory):
+        self.directory = directory
+        self.started = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler()
+        self.baseline = None
+        self.seen = Counter()
+        self.snapshots = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self.baseline = tracemalloc.take_snapshot()
+        self.sampler.start()
+        self.profiler.enable()
+
+    def checkpoint(self, label, force=False):
+        with self.lock:
+            self.seen[label] += 1
+            if not force and self.seen[label] > SNAPSHOTS_PER_STAGE:
+                return
+            current, peak = tracemalloc.get_traced_memory()
+            heading = (f"{label} #{self.seen[label]} at {time.perf_counter() - self.started:.2f}s: "
+                       f"current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB")
+            self.snapshots.append((heading, tracemalloc.take_snapshot()))
+
+    def write_tracemalloc(self, path):
+        def top(stats):
+            own = (s for s in stats if s.traceback[0].filename != tracemalloc.__file__)
+            return [str(s) for _, s in zip(range(TOP_ALLOCATIONS), own)]
+
+        with open(path, "w") as f:
+            for heading, snapshot in self.snapshots:
+                f.write(f"== {heading} ==\n-- top allocations --\n")
+                f.writelines(line + "\n" for line in top(snapshot.statistics("lineno")))
+                f.write("-- growth since start --\n")
+                f.writelines(line + "\n" for line in top(snapshot.compare_to(self.baseline, "lineno")))
+                f.write("\n")
+
+    def stop(self):
+        self.profiler.disable()
+        self.sampler.stop()
+        self.checkpoint("end", force=True)
+        tracemalloc.stop()
+        self.write_tracemalloc(os.path.join(self.directory, "tracemalloc.txt"))
+
+        self.profiler.dump_stats(os.path.join(self.directory, "cprofile.pstats"))
+        text = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats("cumulative").print_stats(40)
+        with open(os.path.join(self.directory, "cprofile.txt"), "w") as f:
+            f.write(text.getvalue())
+        self.sampler.write(os.path.join(self.directory, "stacks.collapsed"))
+
+
+@contextmanager
+def session(directory):
+    """Profile the enclosed block into ``directory``; a no-op if it is None."""
+    global _session
+    if not directory:
+        yield None
+        return
+    os.makedirs(directory, exist_ok=True)
+    _session = ProfileSession(directory)
+    _session.start()
+    try:
+        yield _session
+    finally:
+        current, _session = _session, None
+        current.stop()
+        print(f"🔬 Profile written to {directory}")
+
+
+def checkpoint(label):
+    """Snapshot allocations as the pipeline finishes a unit of stage ``label``."""
+    if _session is not None:
+        _session.checkpoint(label)
+
+
+def add_argument(parser):
+    parser.add_argument("--profile", metavar="DIR",
+                        help="write cProfile stats, tracemalloc reports and collapsed stacks to DIR")
+
+
+def parse_args(description):
+    """Parse the command line of an entry point whose only option is ``--profile``."""
+    parser = argparse.ArgumentParser(description=description)
+    add_argument(parser)
+    return parser.parse_args()
@@ -0,0 +1,144 @@
+"""Per-query freshness tracking and an adaptive query schedule.
+
+``QueryStats`` tracks how many new candidates each query yields and backs
+off queries that keep returning nothing new; ``select()`` picks the due
+queries, best yield first, up to ``SERP_QUERY_BUDGET`` per run.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+
+from tweetbot.urls import url_fingerprint
+
+QUERY_STATS_DB = os.getenv("QUERY_STATS_DB", "query_stats.db")
+QUERY_MIN_INTERVAL = float(os.getenv("QUERY_MIN_INTERVAL", str(6 * 3600)))
+QUERY_MAX_INTERVAL = float(os.getenv("QUERY_MAX_INTERVAL", str(14 * 86400)))
+SERP_QUERY_BUDGET = int(os.getenv("SERP_QUERY_BUDGET", "0")) or None  # SERP calls per run; unset = all due
+NOVELTY_WEIGHT = 0.5  # Weight of the latest call in the novelty average
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    fingerprint TEXT,
+    novelty REAL NOT NULL DEFAULT 0,
+    stale_runs INTEGER NOT NULL DEFAULT 0,
+    last_new INTEGER NOT NULL DEFAULT 0,
+    last_run REAL,
+    next_due REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+
+def query_key(query):
+    return " ".join(query.lower().split())
+
+
+def result_fingerprint(urls):
+    """Order-insensitive fingerprint of a result set."""
+    keys = sorted({url_fingerprint(url) for url in urls})
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+
+
+class QueryStats:
+    """Freshness and yield of each search query, persisted between runs."""
+
+    def __init__(self, path=QUERY_STATS_DB, min_interval=QUERY_MIN_INTERVAL, max_interval=QUERY_MAX_INTERVAL):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def get(self, query):
+        row = self.conn.execute(
+            "SELECT runs, novelty, stale_runs, last_run, next_due FROM queries WHERE key = ?",
+            (query_key(query),),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("runs", "novelty", "stale_runs", "last_run", "next_due"), row))
+
+    def interval(self, stale_runs):
+        return min(self.max_interval, self.min_interval * 2 ** stale_runs)
+
+    def select(self, queries, budget=SERP_QUERY_BUDGET, now=None):
+        """The queries to run now, in the order to run them.
+
+        Never-run queries come first, then due queries by novelty and by
+        how long they have waited.  Queries that are not due are dropped.
+        """
+        now = now or time.time()
+        due = []
+        for position, query in enumerate(queries):
+            stats = self.get(query)
+            if stats is None:
+                due.append(((0, 0.0, position), query))
+            elif stats["next_due"] <= now:
+                due.append(((1, -stats["novelty"], stats["last_run"] or 0), query))
+        due.sort(key=lambda item: item[0])
+        return [query for _, query in due[:budget]]
+
+    def record(self, query, results, new, now=None):
+        """Record one call for ``query``: ``results`` it returned, ``new`` of them not seen before."""
+        now = now or time.time()
+        key = query_key(query)
+        fingerprint = result_fingerprint(results)
+        row = self.conn.execute(
+            "SELECT runs, fingerprint, novelty, stale_runs FROM queries WHERE key = ?", (key,)
+        ).fetchone()
+        runs, previous, novelty, stale_runs = row or (0, None, float(new), 0)
+        if new:
+            stale_runs = 0
+        elif fingerprint == previous:
+            stale_runs += 1  # Same results, all already known: back off
+        else:
+            stale_runs = max(stale_runs, 1)  # Results moved, but to known URLs
+        novelty = NOVELTY_WEIGHT * new + (1 - NOVELTY_WEIGHT) * novelty
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO queries "
+                "(key, query, runs, fingerprint, novelty, stale_runs, last_new, last_run, next_due) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, query, runs + 1, fingerprint, novelty, stale_runs, new, now,
+                 now + self.interval(stale_runs) if stale_runs else now),
+            )
+
+    def rows(self):
+        return self.conn.execute(
+            "SELECT query, runs, novelty, stale_runs, last_new, last_run, next_due FROM queries ORDER BY novelty DESC"
+        ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how productive each search query has been.")
+    parser.add_argument("--db", default=QUERY_STATS_DB)
+    parser.add_argument("--reset", nargs="*", metavar="QUERY", help="Make these queries (or all) due now")
+    args = parser.parse_args()
+
+    stats = QueryStats(args.db)
+    if args.reset is not None:
+        with stats.conn:
+            if args.reset:
+                stats.conn.executemany("UPDATE queries SET next_due = 0, stale_runs = 0 WHERE key = ?",
+                                       [(query_key(q),) for q in args.reset])
+            else:
+                stats.conn.execute("UPDATE queries SET next_due = 0, stale_runs = 0")
+        print("🔄 Reset query schedule")
+    now = time.time()
+    for query, runs, novelty, stale_runs, last_new, last_run, next_due in stats.rows():
+        due = "due" if next_due <= now else f"in {(next_due - now) / 3600:.1f}h"
+        print(f"🔎 {query}: {runs} runs, {novelty:.2f} new/call (last {last_new}), "
+              f"{stale_runs} stale, {due}")
+    stats.close()
+
+
+if __name__ == "__main__":
+    main()
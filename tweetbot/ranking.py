@@ -0,0 +1,160 @@
+"""Score every search candidate at once and keep the best before fetching.
+
+``top_k`` scores candidates on ``FEATURES`` with one NumPy dot product
+against ``WEIGHTS`` (override with ``RANK_WEIGHTS``) and returns the best
+``k`` URLs; it needs ``numpy`` next to ``requests`` and ``scrapy``.
+"""
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# Each in [0, 1]: best SERP position, distinct queries that found it, domain trust,
+# time since we last posted from its domain, and result date (or a current year in the text).
+FEATURES = ("serp_rank", "queries", "trust", "domain_recency", "freshness")
+WEIGHTS = {
+    "serp_rank": 1.0,
+    "queries": 0.5,
+    "trust": 1.0,
+    "domain_recency": 0.7,
+    "freshness": 0.5,
+    "spread": 0.3,  # Subtracted per earlier candidate from the same domain
+    **json.loads(os.getenv("RANK_WEIGHTS", "{}")),
+}
+
+TRUSTED = 1.0  # Configured trusted domain
+LEARNED = 0.6  # Domain learned on an earlier run
+UNKNOWN = 0.2  # Domain seen for the first time
+
+RECENCY_DAYS = 7.0  # A domain posted from this long ago is ~63% "rested"
+RECENCY_WINDOW = 90  # Days of history considered for domain recency
+FRESHNESS_DAYS = 30.0  # A result this old scores ~0.37 for freshness
+UNKNOWN_FRESHNESS = 0.3
+
+_AGO = re.compile(r"(\d+)\s+(minute|hour|day|week|month|year)s?\s+ago", re.I)
+_UNIT_DAYS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
+_DATE_FORMATS = ("%b %d, %Y", "%d %b %Y", "%B %d, %Y", "%Y-%m-%d", "%b %Y")
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(date):
+    """``(days_ago, None)`` for a relative date, ``(None, timestamp)`` for an absolute one."""
+    match = _AGO.search(date)
+    if match:
+        return int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()], None
+    for fmt in _DATE_FORMATS:
+        try:
+            return None, datetime.strptime(date.strip(), fmt).timestamp()
+        except ValueError:
+            continue
+    return None, None
+
+
+def age_days(date, now):
+    """Age in days of a SerpAPI ``date`` ("3 days ago", "Mar 5, 2024"), or None."""
+    if not date:
+        return None
+    days, timestamp = _parse_date(date)
+    if timestamp is not None:
+        return max(0.0, (now - timestamp) / 86400)
+    return days
+
+
+def year_freshness(result, year):
+    """Freshness guessed from the year named in the title or snippet."""
+    text = f"{result.get('title', '')} {result.get('snippet', '')}"
+    if str(year) in text:
+        return 0.8
+    if str(year - 1) in text:
+        return 0.4
+    return UNKNOWN_FRESHNESS
+
+
+def feature_matrix(candidates, now=None):
+    """``(n, len(FEATURES))`` array for candidate dicts with ``best_rank``,
+    ``queries``, ``trust``, ``last_posted`` (timestamp or None) and ``result``."""
+    now = now or time.time()
+    n = len(candidates)
+    best_rank = np.fromiter((c["best_rank"] for c in candidates), float, n)
+    queries = np.fromiter((c["queries"] for c in candidates), float, n)
+    trust = np.fromiter((c["trust"] for c in candidates), float, n)
+    last_posted = np.fromiter(
+        (np.inf if c["last_posted"] is None else (now - c["last_posted"]) / 86400 for c in candidates), float, n
+    )
+    ages = np.fromiter((age_days(c["result"].get("date"), now) for c in candidates), float, n)
+    undated = np.isnan(ages)
+    fresh = np.exp(-np.nan_to_num(ages) / FRESHNESS_DAYS)
+    if undated.any():
+        year = time.localtime(now).tm_year
+        fresh[undated] = [year_freshness(candidates[i]["result"], year) for i in np.flatnonzero(undated)]
+    return np.column_stack((
+        1.0 / np.log2(best_rank + 1.0),
+        1.0 - 1.0 / np.maximum(queries, 1.0),
+        trust,
+        1.0 - np.exp(-last_posted / RECENCY_DAYS),
+        fresh,
+    ))
+
+
+def scores(matrix, domains, weights=None):
+    """Weighted score per row, less ``spread`` per better-scored row of the same domain."""
+    weights = {**WEIGHTS, **(weights or {})}
+    score = matrix @ np.array([weights[name] for name in FEATURES])
+    if not weights["spread"] or not len(score):
+        return score
+    _, domain_ids = np.unique(np.asarray(domains, dtype=object).astype(str), return_inverse=True)
+    # Order by domain, then best score first (stable, so search order breaks ties),
+    # and count how many of the same domain precede each row.
+    order = np.lexsort((np.arange(len(score)), -score, domain_ids))
+    sorted_ids = domain_ids[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_ids)) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    earlier = np.empty(len(score))
+    earlier[order] = np.arange(len(order)) - group_start
+    return score - weights["spread"] * earlier
+
+
+def top_k(candidates, k=None, weights=None, now=None):
+    """URLs of the best ``k`` candidates (all if ``k`` is None), best first."""
+    if not candidates:
+        return []
+    score = scores(feature_matrix(candidates, now), [c["domain"] for c in candidates], weights)
+    order = np.argsort(-score, kind="stable")[:k]
+    return [candidates[i]["url"] for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the ranking stage on synthetic candidates.")
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("-k", type=int, default=25)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = time.time()
+    dates = ["2 days ago", "5 hours ago", "Mar 5, 2024", None, "3 weeks ago"]
+    candidates = [
+        {
+            "url": f"https://site{d}.example.com/post/{i}",
+            "domain": f"site{d}.example.com",
+            "best_rank": int(rng.integers(1, 30)),
+            "queries": int(rng.integers(1, 4)),
+            "trust": float(rng.choice([TRUSTED, LEARNED, UNKNOWN])),
+            "last_posted": None if rng.random() < 0.5 else now - rng.random() * 30 * 86400,
+            "result": {"date": dates[i % len(dates)], "snippet": "Updated for 2025"},
+        }
+        for i, d in enumerate(rng.integers(0, args.domains, args.candidates))
+    ]
+    started = time.perf_counter()
+    best = top_k(candidates, args.k, now=now)
+    elapsed = time.perf_counter() - started
+    print(f"🏅 Ranked {len(candidates)} candidates in {elapsed * 1000:.1f} ms; top {len(best)}: {best[:3]} ...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Per-domain rate limiting, adaptive backoff and circuit breaking.
+
+Every fetch path (direct HTTP, Firecrawl batches, Scrapy) asks the shared
+``DomainLimiter`` before touching a domain and reports the status it got
+back.  Each domain has a token bucket whose rate is cut in half on a 429
+or 503 and grows back slowly on success, and ``Retry-After`` pauses the
+domain until the server says it is ready.  A domain that keeps failing
+trips its circuit breaker and is parked for a cooldown that doubles with
+each recent trip and decays again as time passes without trouble, so a
+throttling host is skipped for a while instead of blacklisted forever.
+Breaker state is saved to ``BREAKER_STATE_FILE`` so it survives runs:
+changes are collected and merged into the file in one locked, atomic
+write at stage boundaries (``save()``) and at exit, so overlapping runs
+keep each other's breakers.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from tweetbot import state
+
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "5"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MIN_RPS = float(os.getenv("RATE_LIMIT_MIN_RPS", "0.1"))
+# Per-domain rate overrides in requests per second,
+# e.g. RATE_LIMITS='{"serpapi.com": 1}'.  SerpAPI is a paid API that
+# enforces its own hourly quota, so it is not paced like a scraped site
+# and queries can be searched in parallel.
+DOMAIN_RATES = {"serpapi.com": 20, **json.loads(os.getenv("RATE_LIMITS", "{}"))}
+
+BREAKER_STATE_FILE = os.getenv("BREAKER_STATE_FILE", "breaker_state.json")
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "3"))  # Consecutive failures
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "900"))  # 15 minutes
+BREAKER_COOLDOWN_MAX = float(os.getenv("BREAKER_COOLDOWN_MAX", str(7 * 24 * 3600)))
+BREAKER_DECAY = float(os.getenv("BREAKER_DECAY", str(24 * 3600)))  # Strike half-life
+
+THROTTLE_STATUSES = {429, 503}
+FAILURE_STATUSES = THROTTLE_STATUSES | {500, 502, 504}
+
+
+class CircuitOpen(Exception):
+    """Raised when a request targets a domain whose breaker is open."""
+
+
+def parse_retry_after(value):
+    """Seconds from a ``Retry-After`` header value (str or bytes), or None."""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts additively up, multiplicatively down."""
+
+    def __init__(self, rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """Take a token; returns how long the caller must wait before using it."""
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def throttled(self, now, retry_after=None):
+        self.rate = max(RATE_LIMIT_MIN_RPS, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+    def succeeded(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """Per-domain breaker state: closed → open (parked) → half-open → closed."""
+
+    def __init__(self, strikes=0.0, last_trip=0.0, open_until=0.0):
+        self.strikes = strikes
+        self.last_trip = last_trip
+        self.open_until = open_until
+        self.failures = 0
+        self.probing = False
+
+    def decayed_strikes(self, now):
+        if not self.strikes:
+            return 0.0
+        return self.strikes * 0.5 ** ((now - self.last_trip) / BREAKER_DECAY)
+
+    def allow(self, now):
+        if now < self.open_until:
+            return False
+        if self.open_until and not self.probing:
+            self.probing = True  # Half-open: let a single trial request through
+            return True
+        return not self.probing
+
+    def trip(self, now, at_least=0.0):
+        self.strikes = self.decayed_strikes(now) + 1
+        self.last_trip = now
+        cooldown = min(BREAKER_COOLDOWN_MAX, BREAKER_COOLDOWN * 2 ** (self.strikes - 1))
+        self.open_until = now + max(cooldown, at_least)
+        self.failures = 0
+        self.probing = False
+
+    def close(self):
+        self.open_until = 0.0
+        self.failures = 0
+        self.probing = False
+
+    def to_json(self):
+        return {"strikes": self.strikes, "last_trip": self.last_trip, "open_until": self.open_until}
+
+    def worth_keeping(self, now):
+        return self.open_until > now or self.decayed_strikes(now) >= 0.05
+
+
+class DomainLimiter:
+    """Token buckets and circuit breakers for every domain we talk to."""
+
+    def __init__(self, state_file=BREAKER_STATE_FILE, rates=None):
+        self.state_file = state_file
+        self.rates = DOMAIN_RATES if rates is None else rates
+        self.buckets = {}
+        self.breakers = {}
+        self.dirty = set()  # Domains whose breaker changed since the last save
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.state_file:
+            return
+        for domain, saved in state.load_json(self.state_file, {}).items():
+            self.breakers[domain] = CircuitBreaker(**saved)
+
+    def save(self):
+        """Merge breakers changed since the last save into ``state_file``.
+
+        Domains this process did not touch keep whatever other runs wrote.
+        """
+        if not self.state_file:
+            return
+        with self.lock:
+            if not self.dirty:
+                return
+            changed = {domain: self.breakers[domain].to_json() for domain in self.dirty}
+            self.dirty = set()
+
+        def merge(saved):
+            now = time.time()
+            saved.update(changed)
+            return {domain: data for domain, data in saved.items()
+                    if CircuitBreaker(**data).worth_keeping(now)}
+
+        state.update_json(self.state_file, {}, merge)
+
+    def _bucket(self, domain):
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            bucket = self.buckets[domain] = TokenBucket(float(self.rates.get(domain, RATE_LIMIT_RPS)))
+        return bucket
+
+    def _breaker(self, domain):
+        breaker = self.breakers.get(domain)
+        if breaker is None:
+            breaker = self.breakers[domain] = CircuitBreaker()
+        return breaker
+
+    def acquire(self, domain):
+        """Wait for a token for ``domain``; returns False if its breaker is open."""
+        with self.lock:
+            if not self._breaker(domain).allow(time.time()):
+                return False
+            wait = self._bucket(domain).reserve(time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def record(self, domain, status, retry_after=None):
+        """Report the outcome of a request; ``status=None`` means it never got a response."""
+        now = time.time()
+        changed = False
+        with self.lock:
+            bucket = self._bucket(domain)
+            breaker = self._breaker(domain)
+            if status is not None and status not in FAILURE_STATUSES:
+                bucket.succeeded()
+                changed = breaker.probing or breaker.open_until > 0
+                breaker.close()
+            else:
+                if status in THROTTLE_STATUSES:
+                    bucket.throttled(time.monotonic(), retry_after)
+                breaker.failures += 1
+                long_wait = retry_after is not None and retry_after > BREAKER_COOLDOWN
+                if breaker.probing or long_wait or breaker.failures >= BREAKER_THRESHOLD:
+                    breaker.trip(now, at_least=retry_after or 0.0)
+                    changed = True
+                    print(f"⛔ Circuit open for {domain} until "
+                          f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(breaker.open_until))}")
+            if changed:
+                self.dirty.add(domain)
+
+    def release(self, domain):
+        """Give up a request that produced no outcome for the site, freeing a half-open probe."""
+        with self.lock:
+            breaker = self.breakers.get(domain)
+            if breaker is not None:
+                breaker.probing = False
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide limiter, loading saved breaker state on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = DomainLimiter()
+                atexit.register(_limiter.save)
+    return _limiter
+
+
+def finish():
+    """Save breaker changes not yet written."""
+    if _limiter is not None:
+        _limiter.save()
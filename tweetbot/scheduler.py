@@ -0,0 +1,238 @@
+"""Durable post queue with human-like due times.
+
+Composed tweets are queued with jittered due times and off days, and
+``run_due`` posts whatever is due.  A post is marked ``sending`` before
+it goes out, so one left in doubt by a crash is reconciled against the
+timeline rather than posted twice.
+"""
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from tweetbot import metrics, xclient
+from tweetbot.urls import url_fingerprint
+
+QUEUE_DB = os.getenv("QUEUE_DB", "post_queue.db")
+MIN_GAP = 60 * 60 * 4  # 4 hours between posts
+MAX_GAP = 60 * 60 * 8  # 8 hours between posts
+
+# Chance to skip posting for the day (simulating human off days)
+OFF_DAY_CHANCE = 0.15  # 15% of days no tweets
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 15 * 60  # Doubles with each failed attempt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    due_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at REAL NOT NULL,
+    posted_at REAL
+);
+CREATE INDEX IF NOT EXISTS posts_due ON posts (status, due_at);
+CREATE TABLE IF NOT EXISTS off_days (
+    day TEXT PRIMARY KEY,
+    off INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_limits (
+    endpoint TEXT PRIMARY KEY,
+    max_requests INTEGER,
+    remaining INTEGER NOT NULL,
+    reset_at REAL NOT NULL
+);
+"""
+
+# Columns added to ``posts`` after the first release.
+POST_COLUMNS = {
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "tweet_id": "TEXT",
+    "last_error": "TEXT",
+}
+
+
+class PostQueue:
+    """Queue of composed tweets, each with a due time."""
+
+    def __init__(self, path=QUEUE_DB, min_gap=MIN_GAP, max_gap=MAX_GAP, off_day_chance=OFF_DAY_CHANCE):
+        self.path = path
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.off_day_chance = off_day_chance
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(posts)")}
+        with self.conn:
+            for name, definition in POST_COLUMNS.items():
+                if name not in existing:
+                    self.conn.execute(f"ALTER TABLE posts ADD COLUMN {name} {definition}")
+
+    def __contains__(self, url):
+        row = self.conn.execute("SELECT 1 FROM posts WHERE key = ?", (url_fingerprint(url),)).fetchone()
+        return row is not None
+
+    def is_off_day(self, day):
+        """Whether ``day`` is an off day; decided once per date and remembered."""
+        key = day.isoformat()
+        row = self.conn.execute("SELECT off FROM off_days WHERE day = ?", (key,)).fetchone()
+        if row is None:
+            off = random.random() < self.off_day_chance
+            with self.conn:
+                self.conn.execute("INSERT INTO off_days (day, off) VALUES (?, ?)", (key, int(off)))
+            return off
+        return bool(row[0])
+
+    def next_due_time(self, now=None):
+        """Pick a due time 4–8h after the last queued post, skipping off days."""
+        now = now or time.time()
+        last = self.conn.execute(
+            "SELECT MAX(due_at) FROM posts WHERE status = 'pending'"
+        ).fetchone()[0]
+        due = datetime.fromtimestamp(max(now, last or now) + random.randint(self.min_gap, self.max_gap))
+        while self.is_off_day(due.date()):
+            due += timedelta(days=1)
+        return due.timestamp()
+
+    def enqueue(self, text, url, due_at=None):
+        """Queue a tweet; returns its due time, or None if the URL is already queued."""
+        due_at = due_at or self.next_due_time()
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO posts (key, url, text, due_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (url_fingerprint(url), url, text, due_at, time.time()),
+            )
+        return due_at if cur.rowcount else None
+
+    def due(self, now=None):
+        """Pending posts whose due time has passed, oldest first."""
+        return self.conn.execute(
+            "SELECT id, text, url FROM posts WHERE status = 'pending' AND due_at <= ? ORDER BY due_at",
+            (now or time.time(),),
+        ).fetchall()
+
+    def in_doubt(self):
+        """Posts that were being sent when a previous run stopped."""
+        return self.conn.execute(
+            "SELECT id, text, url FROM posts WHERE status = 'sending' ORDER BY due_at"
+        ).fetchall()
+
+    def claim(self, post_id):
+        """Mark a post as being sent, before it goes out."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE posts SET status = 'sending', attempts = attempts + 1 WHERE id = ?", (post_id,)
+            )
+
+    def mark(self, post_id, status, tweet_id=None, error=None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE posts SET status = ?, posted_at = ?, tweet_id = ?, last_error = ? WHERE id = ?",
+                (status, time.time(), tweet_id, error, post_id),
+            )
+
+    def reschedule(self, post_id, due_at, error=None):
+        """Put a post back to pending, or fail it once it has used up its attempts."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE posts SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "due_at = ?, last_error = ? WHERE id = ?",
+                (MAX_ATTEMPTS, due_at, error, post_id),
+            )
+
+    def attempts(self, post_id):
+        return self.conn.execute("SELECT attempts FROM posts WHERE id = ?", (post_id,)).fetchone()[0]
+
+    def rate_limit(self, endpoint):
+        row = self.conn.execute(
+            "SELECT max_requests, remaining, reset_at FROM rate_limits WHERE endpoint = ?", (endpoint,)
+        ).fetchone()
+        return {"limit": row[0], "remaining": row[1], "reset_at": row[2]} if row else None
+
+    def save_rate_limit(self, endpoint, window):
+        if not window:
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (endpoint, max_requests, remaining, reset_at) "
+                "VALUES (?, ?, ?, ?)",
+                (endpoint, window["limit"], window["remaining"], window["reset_at"]),
+            )
+
+    def pending_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM posts WHERE status = 'pending'").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def _record_posted(queue, history, post_id, url, tweet_id):
+    queue.mark(post_id, "posted", tweet_id=tweet_id)
+    if history is not None:
+        history.append(url, tweet_id=tweet_id)
+        history.commit()
+
+
+def reconcile(queue, client, history=None):
+    """Resolve posts left in ``sending`` by checking the account's timeline."""
+    for post_id, text, url in queue.in_doubt():
+        try:
+            tweet_id = client.find_posted(text)
+        except Exception as e:
+            print(f"⚠ Could not check whether post {post_id} went out: {e}")
+            continue
+        if tweet_id:
+            print(f"🔎 Post {post_id} was already published as {tweet_id}")
+            _record_posted(queue, history, post_id, url, tweet_id)
+        else:
+            queue.reschedule(post_id, time.time(), "not found on timeline")
+
+
+def run_due(queue, client, history=None, now=None):
+    """Post every due tweet through ``client`` (an ``XClient``); returns how many went out.
+
+    Sending stops once X's rate-limit window is spent; the rest stay
+    queued.  A definite failure is retried on a later run with backoff,
+    an unknown outcome is reconciled against the timeline first, and
+    posted URLs are recorded in ``history`` with their tweet IDs.
+    """
+    if client.window is None:
+        client.window = queue.rate_limit("tweets")
+    reconcile(queue, client, history)
+    posted = 0
+    for post_id, text, url in queue.due(now):
+        wait = client.wait_time()
+        if wait:
+            print(f"⏳ X rate limit reached; {queue.pending_count()} posts wait until "
+                  f"{datetime.fromtimestamp(time.time() + wait):%Y-%m-%d %H:%M}")
+            break
+
+        queue.claim(post_id)
+        with metrics.stage("post"):
+            result = client.post(text)
+        queue.save_rate_limit("tweets", client.window)
+        metrics.count("tweets_total", result=result.status)
+        print(f"[{datetime.now()}] {result.status} - {text}")
+
+        if result.status == xclient.UNKNOWN:
+            try:
+                tweet_id = client.find_posted(text)
+            except Exception as e:
+                print(f"⚠ Post {post_id} outcome unknown ({result.error}); will check next run: {e}")
+                continue
+            if tweet_id:
+                result = result._replace(status=xclient.POSTED, tweet_id=tweet_id)
+
+        if result.status in (xclient.POSTED, xclient.DUPLICATE):
+            _record_posted(queue, history, post_id, url, result.tweet_id)
+            posted += 1
+        elif result.status == xclient.FAILED:
+            queue.mark(post_id, "failed", error=result.error)
+        else:
+            retry_at = result.retry_at or time.time() + RETRY_BACKOFF * 2 ** (queue.attempts(post_id) - 1)
+            queue.reschedule(post_id, retry_at, result.error)
+    return posted
@@ -0,0 +1,220 @@
+"""One long-lived Scrapy engine for the whole candidate list.
+
+``ScrapyEngine`` runs the reactor in a background thread with a single
+open ``SimpleSpider``; URLs are fed to it and items come back with their
+HTTP status, which is reported to the shared per-domain limiter.
+"""
+import os
+import queue
+import threading
+
+from scrapy import signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import Request, TextResponse
+from scrapy.settings import Settings
+from scrapy.spiders import Spider
+from scrapy.utils.reactor import install_reactor
+
+from tweetbot import metrics, profiling
+from tweetbot.ratelimit import get_limiter, parse_retry_after
+from tweetbot.urls import extract_domain
+
+CONTENT_CHARS = 1000
+BODY_TEXT = "//body//text()[not(ancestor::script or ancestor::style)]"
+# Give up on the URLs still in flight if no item arrives for this long.
+RESULT_TIMEOUT = float(os.getenv("SCRAPY_RESULT_TIMEOUT", "180"))
+
+SCRAPY_SETTINGS = {
+    "LOG_ENABLED": False,
+    "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
+    "CONCURRENT_REQUESTS": 16,
+    "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
+    "DOWNLOAD_DELAY": 2,  # Per domain: Scrapy keys download slots by host
+    "AUTOTHROTTLE_ENABLED": True,
+    "AUTOTHROTTLE_START_DELAY": 2,
+    "AUTOTHROTTLE_MAX_DELAY": 30,
+    "AUTOTHROTTLE_TARGET_CONCURRENCY": 1.0,
+    "RETRY_ENABLED": False,
+    "HTTPERROR_ALLOW_ALL": True,
+    "ITEM_PIPELINES": {"tweetbot.scrapy_engine.CollectPipeline": 100},
+}
+
+
+class SimpleSpider(Spider):
+    name = "simple"
+    custom_settings = {
+        "DOWNLOAD_TIMEOUT": 30,  # 30-second timeout
+        "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+
+    def __init__(self, engine=None, *args, **kwargs):
+        super(SimpleSpider, self).__init__(*args, **kwargs)
+        self.engine = engine
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+
+    def start_requests(self):
+        return []
+
+    def spider_opened(self, spider):
+        self.engine._opened.set()
+
+    def spider_idle(self, spider):
+        if not self.engine._closing:
+            raise DontCloseSpider
+
+    def make_request(self, url):
+        return Request(url, callback=self.parse, errback=self.failed,
+                       dont_filter=True, meta={"source": url})
+
+    def parse(self, response):
+        item = {
+            "source": response.meta["source"],
+            "status": response.status,
+            "retry_after": parse_retry_after(response.headers.get("Retry-After")),
+            "latency": response.meta.get("download_latency"),
+        }
+        if response.status == 200 and not isinstance(response, TextResponse):
+            item["error"] = "not a text page"
+        elif response.status == 200:
+            # Every request must produce an item, or the consumer waits for it.
+            try:
+                item.update({
+                    "title": response.css("title::text").get(default="Untitled").strip(),
+                    "url": response.url,
+                    "canonical": response.css("link[rel=canonical]::attr(href)").get(),
+                    "content": " ".join(
+                        text.strip() for text in response.xpath(BODY_TEXT).getall() if text.strip()
+                    )[:CONTENT_CHARS]  # Limit content for brevity
+                })
+            except Exception as e:
+                item["error"] = repr(e)
+        yield item
+
+    def failed(self, failure):
+        response = getattr(failure.value, "response", None)
+        yield {
+            "source": failure.request.meta["source"],
+            "status": response.status if response is not None else None,
+            "retry_after": parse_retry_after(response.headers.get("Retry-After")) if response is not None else None,
+            "error": repr(failure.value),
+        }
+
+
+class CollectPipeline:
+    """Hand scraped items back to the engine's consumer thread."""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_item(self, item, spider=None):
+        self.crawler.spider.engine._deliver(item)
+        return item
+
+
+class ScrapyEngine:
+    """Background Scrapy crawler that scrapes URLs on demand."""
+
+    def __init__(self, settings=None, max_in_flight=None, limiter=None, result_timeout=RESULT_TIMEOUT):
+        self.settings = dict(SCRAPY_SETTINGS, **(settings or {}))
+        self.limiter = limiter or get_limiter()
+        self.max_in_flight = max_in_flight or self.settings["CONCURRENT_REQUESTS"] * 2
+        self.result_timeout = result_timeout
+        self.statuses = {}
+        self._results = queue.Queue()
+        self._opened = threading.Event()
+        self._closing = False
+        self._thread = None
+        self._crawler = None
+        self._reactor = None
+
+    def start(self):
+        if self._thread:
+            return self
+        self._thread = threading.Thread(target=self._run, name="scrapy-reactor", daemon=True)
+        self._thread.start()
+        if not self._opened.wait(timeout=60):
+            raise RuntimeError("Scrapy engine did not start")
+        return self
+
+    def _run(self):
+        install_reactor(self.settings["TWISTED_REACTOR"])
+        from twisted.internet import reactor
+
+        self._reactor = reactor
+        runner = CrawlerRunner(Settings(self.settings))
+        self._crawler = runner.create_crawler(SimpleSpider)
+        runner.crawl(self._crawler, engine=self)
+        reactor.run(installSignalHandlers=False)
+
+    def _deliver(self, item):
+        self.statuses[item["source"]] = item.get("status")
+        if item.get("latency") is not None:
+            metrics.span("scrape", item["latency"])
+        metrics.count("pages_total", source="scrapy", result=item.get("status") or "error")
+        self.limiter.record(extract_domain(item["source"]), item.get("status"), item.get("retry_after"))
+        self._results.put(item)
+
+    def _schedule(self, url):
+        self._crawler.engine.crawl(self._crawler.spider.make_request(url))
+
+    def scrape(self, urls):
+        """Yield ``(source, item)`` for each URL as it completes.
+
+        Items always have ``status``; successful pages also carry ``title``,
+        ``url``, ``canonical`` and ``content``.  At most ``max_in_flight``
+        URLs are handed to Scrapy ahead of the consumer; URLs whose domain
+        is parked by its circuit breaker are skipped.  If nothing comes back
+        for ``result_timeout`` seconds, the URLs still in flight are yielded
+        with an ``error`` and no status.
+        """
+        self.start()
+        urls = iter(urls)
+        in_flight = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < self.max_in_flight:
+                url = next(urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                domain = extract_domain(url)
+                if not self.limiter.acquire(domain):
+                    print(f"⛔ Skipping {url}: {domain} is cooling off")
+                    continue
+                self._reactor.callFromThread(self._schedule, url)
+                in_flight.add(url)
+            if not in_flight:
+                return
+            try:
+                item = self._results.get(timeout=self.result_timeout)
+            except queue.Empty:
+                print(f"⚠ No Scrapy results for {self.result_timeout:g}s, giving up on {len(in_flight)} URLs")
+                for source in in_flight:
+                    self.limiter.release(extract_domain(source))
+                    yield source, {"source": source, "status": None, "error": "timed out"}
+                in_flight.clear()
+                continue
+            if item["source"] not in in_flight:
+                continue  # Arrived after we gave up on it
+            in_flight.discard(item["source"])
+            profiling.checkpoint("scrape")
+            yield item["source"], item
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._closing = True
+        self._reactor.callFromThread(self._reactor.stop)
+        self._thread.join(timeout=30)
+        self._thread = None
@@ -0,0 +1,93 @@
+"""SerpAPI search with a persistent response cache.
+
+Search result pages barely change between our daily runs, so responses
+are cached on disk keyed by the normalised query and parameters (never
+the API key).  Within the TTL a repeated query costs no SerpAPI call;
+slightly stale results are served while being refreshed in the
+background.  At most ``SERPAPI_CONCURRENCY`` calls are in flight at
+once, however many queries and result pages are being fetched in
+parallel.
+"""
+import json
+import os
+import threading
+
+from tweetbot import httpclient, metrics
+from tweetbot.cache import DiskCache
+
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search.json")
+SERP_CACHE_DB = os.getenv("SERP_CACHE_DB", "serp_cache.db")
+SERP_CACHE_TTL = float(os.getenv("SERP_CACHE_TTL", str(6 * 3600)))
+SERP_CACHE_STALE_TTL = float(os.getenv("SERP_CACHE_STALE_TTL", str(18 * 3600)))
+SERP_CACHE_MAX_ENTRIES = int(os.getenv("SERP_CACHE_MAX_ENTRIES", "5000"))
+SERPAPI_CONCURRENCY = int(os.getenv("SERPAPI_CONCURRENCY", "8"))
+PAGE_SIZE = 10  # Google's results per page; more are fetched with ``start``
+
+# Per-query TTL overrides in seconds, keyed by normalised query text,
+# e.g. SERP_CACHE_TTLS='{"agentic ai": 3600}'
+QUERY_TTLS = json.loads(os.getenv("SERP_CACHE_TTLS", "{}"))
+
+RESULT_FIELDS = ("position", "title", "link", "snippet", "date")
+
+_cache = None
+_cache_lock = threading.Lock()
+_in_flight = threading.BoundedSemaphore(SERPAPI_CONCURRENCY)
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(SERP_CACHE_DB, max_entries=SERP_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def cache_key(query, params):
+    key = {k: v for k, v in params.items() if k != "api_key"}
+    key["q"] = normalize_query(query)
+    return json.dumps(key, sort_keys=True, separators=(",", ":"))
+
+
+def _fetch(query, api_key, params):
+    with _in_flight:
+        r = httpclient.get(SERPAPI_URL, params={"q": query, "api_key": api_key, **params})
+    r.raise_for_status()
+    metrics.count("credits_total", api="serpapi")
+    data = r.json()
+    # Keep only what the bot reads so cache entries stay small.
+    return {
+        "organic_results": [
+            {k: res[k] for k in RESULT_FIELDS if k in res}
+            for res in data.get("organic_results", [])
+        ]
+    }
+
+
+def search(query, api_key, ttl=None, **params):
+    """Return SerpAPI results for ``query``, served from cache when fresh."""
+    if ttl is None:
+        ttl = QUERY_TTLS.get(normalize_query(query), SERP_CACHE_TTL)
+    return get_cache().get_or_fetch(
+        cache_key(query, params),
+        lambda: _fetch(query, api_key, params),
+        ttl,
+        SERP_CACHE_STALE_TTL,
+    )
+
+
+def finish():
+    """Wait for background refreshes and report cache effectiveness."""
+    if _cache is None:
+        return
+    _cache.wait()
+    stats = _cache.stats()
+    metrics.cache_stats("serpapi", stats)
+    print(
+        f"💾 SerpAPI cache: {stats['hits']} hits, {stats['stale_hits']} stale, "
+        f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)"
+    )
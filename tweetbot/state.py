@@ -0,0 +1,82 @@
+"""Crash-safe JSON state files that overlapping runs can share.
+
+Writes are atomic (temporary file, fsync, rename) and ``update_json``
+holds a lock on ``<file>.lock`` across its read-modify-write; a file
+that cannot be read is set aside as ``<file>.corrupt``.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive advisory lock for ``path`` across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_json(path, default):
+    """Contents of ``path``, or ``default`` if it is missing or unreadable."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except ValueError:
+        print(f"⚠ {path} is corrupt; moving it to {path}.corrupt and starting afresh")
+        try:
+            os.replace(path, f"{path}.corrupt")
+        except OSError:
+            pass  # Another run got there first
+        return default
+
+
+def write_json(path, data):
+    """Atomically replace ``path`` with ``data`` as JSON."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    # Make the rename itself durable.
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def update_json(path, default, change):
+    """Read ``path``, apply ``change(data)`` and write the result, all under its lock.
+
+    Returns what was written.
+    """
+    with locked(path):
+        data = change(load_json(path, default))
+        write_json(path, data)
+    return data
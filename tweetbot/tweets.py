@@ -0,0 +1,16 @@
+"""Tweet text for a found resource."""
+import random
+
+PREFIXES = ["🚀", "📢", "🔥", "💡", "🎯", "🧠"]
+TEMPLATES = [
+    "{prefix} {title} {url}",
+    "{prefix} Check this out: {title} {url}",
+    "{prefix} New resource: {title} {url}",
+    "{prefix} Just found: {title} {url}",
+    "{prefix} Insight drop: {title} {url}"
+]
+
+
+def make_tweet(title, url):
+    template = random.choice(TEMPLATES)
+    return template.format(prefix=random.choice(PREFIXES), title=title.strip(), url=url)
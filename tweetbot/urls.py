@@ -0,0 +1,83 @@
+"""URL canonicalization and fixed-size fingerprints for dedup.
+
+The same article is routinely reached through tracking parameters,
+fragments, trailing slashes, http/https, mobile hosts or AMP variants.
+``canonicalize_url`` folds those into one form and ``url_fingerprint``
+turns it into a compact digest that history and in-run dedup compare.
+"""
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from tweetbot.domains import has_registrable_domain
+
+# Only keys known to be trackers: generic ones such as ``ref`` can select content.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref_src", "_hsenc", "_hsmi", "mkt_tok", "spm", "cmpid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "_ga", "oly_")
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+FINGERPRINT_BYTES = 16
+
+_DUPLICATE_SLASHES = re.compile(r"/{2,}")
+
+
+def extract_domain(url):
+    """Host of ``url`` without a ``www.``/``m.``/``amp.`` prefix, unless the
+    prefix is the site itself (``amp.dev``, ``m.co.uk``)."""
+    try:
+        domain = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    for prefix in HOST_PREFIXES:
+        if domain.startswith(prefix) and has_registrable_domain(domain[len(prefix):]):
+            return domain[len(prefix):]
+    return domain
+
+
+def _is_tracking(name, value):
+    name = name.lower()
+    if name == "amp":
+        return value in ("", "1")  # WordPress-style ?amp / ?amp=1 serves the same post
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url, canonical=None):
+    """Return a normalized form of ``url``.
+
+    ``canonical`` is the page's ``<link rel=canonical>`` (or Firecrawl's
+    reported source URL); when present it wins over the fetched URL.
+    """
+    if canonical:
+        url = urljoin(url, canonical.strip())
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    if parts.scheme not in ("http", "https", ""):
+        return url.strip()
+
+    host = extract_domain(url)
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = _DUPLICATE_SLASHES.sub("/", parts.path or "/")
+    # WordPress serves the AMP copy of ``/<post>/`` at ``/<post>/amp/``.  Other
+    # AMP pages name their original in rel=canonical, which wins above.
+    if path.endswith("/amp/") and path.count("/") > 2:
+        path = path[:-len("amp/")]
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k, v)]
+    query.sort()
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def url_fingerprint(url, canonical=None):
+    """Fixed-size hex digest of the canonical form of ``url``."""
+    canon = canonicalize_url(url, canonical)
+    return hashlib.blake2b(canon.encode("utf-8"), digest_size=FINGERPRINT_BYTES).hexdigest()
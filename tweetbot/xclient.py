@@ -0,0 +1,116 @@
+"""X (Twitter) posting client that knows its rate-limit window.
+
+Every response's ``x-rate-limit-*`` headers update ``XClient.window``, so
+the outbox (``tweetbot.scheduler.run_due``) can stop sending once the
+window is spent instead of collecting 429s.  A post whose outcome is
+unknown (timeout, dropped connection, 5xx) may still have gone out, so
+it is never simply re-sent: ``find_posted`` first looks for it on the
+account's recent timeline.  X's duplicate-content rejection also counts
+as already posted.
+"""
+import os
+import re
+import time
+from collections import namedtuple
+
+import requests
+
+from tweetbot import httpclient
+from tweetbot.ratelimit import CircuitOpen
+
+X_API_URL = os.getenv("X_API_URL", "https://api.x.com").rstrip("/")
+RECONCILE_LOOKBACK = 20  # Recent tweets checked when an outcome is unknown
+RETRY_DELAY = 15 * 60  # Retry after this long when X gives no reset time
+
+POSTED = "posted"
+DUPLICATE = "duplicate"  # X already has this text: treat as posted
+RETRY = "retry"  # Definitely not posted; try again at retry_at
+UNKNOWN = "unknown"  # May or may not have been posted; reconcile first
+FAILED = "failed"  # Rejected; retrying will not help
+
+PostResult = namedtuple("PostResult", "status tweet_id retry_at error")
+
+_URLS = re.compile(r"https?://\S+")
+
+
+def _normalize(text):
+    # X rewrites links to t.co, so compare tweets without their URLs.
+    return " ".join(_URLS.sub("", text).split())
+
+
+class XClient:
+    def __init__(self, bearer_token, base_url=X_API_URL):
+        self.bearer_token = bearer_token
+        self.base_url = base_url
+        self.window = None  # {"limit", "remaining", "reset_at"} for POST /2/tweets
+        self._user_id = None
+
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.bearer_token}", "Content-Type": "application/json"}
+
+    def _update_window(self, r):
+        remaining = r.headers.get("x-rate-limit-remaining")
+        reset = r.headers.get("x-rate-limit-reset")
+        if remaining is None or reset is None:
+            return
+        self.window = {
+            "limit": int(r.headers.get("x-rate-limit-limit") or 0) or None,
+            "remaining": int(remaining),
+            "reset_at": float(reset),
+        }
+
+    def wait_time(self, now=None):
+        """Seconds until another post fits in the rate-limit window (0 if it fits now)."""
+        now = now or time.time()
+        if not self.window or self.window["remaining"] > 0:
+            return 0.0
+        return max(0.0, self.window["reset_at"] - now)
+
+    def post(self, text):
+        """Send one tweet; never retried here, see ``PostResult`` statuses."""
+        now = time.time()
+        try:
+            r = httpclient.post(f"{self.base_url}/2/tweets", json={"text": text},
+                                headers=self._headers(), retries=0)
+        except CircuitOpen as e:
+            return PostResult(RETRY, None, now + RETRY_DELAY, str(e))
+        except requests.ConnectionError as e:
+            if isinstance(e, requests.ConnectTimeout):
+                return PostResult(RETRY, None, now + RETRY_DELAY, repr(e))
+            return PostResult(UNKNOWN, None, None, repr(e))
+        except requests.Timeout as e:
+            return PostResult(UNKNOWN, None, None, repr(e))
+
+        self._update_window(r)
+        if r.status_code == 201:
+            return PostResult(POSTED, r.json().get("data", {}).get("id"), None, None)
+        detail = r.text[:200]
+        if r.status_code == 429:
+            retry_at = self.window["reset_at"] if self.window else now + RETRY_DELAY
+            return PostResult(RETRY, None, retry_at, detail)
+        if r.status_code == 403 and "duplicate" in detail.lower():
+            return PostResult(DUPLICATE, None, None, detail)
+        if r.status_code >= 500:
+            return PostResult(UNKNOWN, None, None, detail)
+        return PostResult(FAILED, None, None, f"{r.status_code}: {detail}")
+
+    def user_id(self):
+        if self._user_id is None:
+            r = httpclient.get(f"{self.base_url}/2/users/me", headers=self._headers())
+            r.raise_for_status()
+            self._user_id = r.json()["data"]["id"]
+        return self._user_id
+
+    def find_posted(self, text):
+        """ID of a recent tweet on our timeline matching ``text``, or None."""
+        r = httpclient.get(
+            f"{self.base_url}/2/users/{self.user_id()}/tweets",
+            params={"max_results": RECONCILE_LOOKBACK},
+            headers=self._headers(),
+        )
+        r.raise_for_status()
+        wanted = _normalize(text)
+        for tweet in r.json().get("data") or []:
+            if _normalize(tweet.get("text", "")) == wanted:
+                return tweet["id"]
+        return None